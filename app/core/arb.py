@@ -9,6 +9,8 @@ across exchanges. It includes:
 
 from __future__ import annotations
 
+import math
+import sys
 from typing import Iterable, List
 
 from app.config.settings import settings
@@ -37,6 +39,9 @@ def compute_arb_percentage(edge_bps: float) -> float:
 def calculate_profit_for_budget(edge_bps: float, max_notional: float, budget: float) -> tuple[float, float, float]:
     """Calculate profit and stake sizing for a given budget.
     
+    `edge_bps` and `max_notional` may also be NumPy arrays, in which case each
+    returned value is an array with one entry per opportunity.
+    
     Args:
         edge_bps: Edge in basis points
         max_notional: Maximum notional per leg
@@ -50,8 +55,10 @@ def calculate_profit_for_budget(edge_bps: float, max_notional: float, budget: fl
         - stake_short: Amount to stake on short leg
         - profit: Expected profit
     """
+    import numpy as np
+
     # Cap by budget and max_notional
-    actual_notional = min(budget, max_notional)
+    actual_notional = np.minimum(budget, max_notional)
     
     # For cross-exchange arb, we're hedging:
     # - Long leg: buy YES at price P
@@ -71,8 +78,23 @@ def calculate_profit_for_budget(edge_bps: float, max_notional: float, budget: fl
 
 
 def detect_arbs(
-    kalshi_quotes: Iterable[MarketQuote], polymarket_quotes: Iterable[MarketQuote]
+    kalshi_quotes: Iterable[MarketQuote],
+    polymarket_quotes: Iterable[MarketQuote],
+    *,
+    total_bps: float | None = None,
+    min_profit_usd: float | None = None,
 ) -> List[CrossExchangeArb]:
+    """Cross-exchange arbs between events with identical normalized titles.
+
+    `total_bps` (fees plus slippage buffer) and `min_profit_usd` default to the
+    current settings; passing them lets callers sweep values without touching
+    the global settings.
+    """
+    if total_bps is None:
+        total_bps = settings.fees.taker_bps + settings.risk.slippage_bps
+    if min_profit_usd is None:
+        min_profit_usd = settings.risk.min_profit_usd
+
     # Index by event -> outcome quotes
     from collections import defaultdict
 
@@ -91,9 +113,6 @@ def detect_arbs(
         k = k_by_event[event_key]
         p = p_by_event[event_key]
         if "YES" in k and "NO" in p:
-            # Account for fees and slippage buffers on both legs
-            total_bps = settings.fees.taker_bps + settings.risk.slippage_bps
-            
             # Use order book depth to cap size and estimate slippage
             long_size, short_size, actual_notional = cap_order_by_liquidity(
                 k["YES"], p["NO"], settings.risk.max_notional_per_leg
@@ -109,7 +128,7 @@ def detect_arbs(
             
             if edge_bps > 0 and actual_notional > 0:
                 gross_profit = edge_bps / 10000.0 * actual_notional
-                if gross_profit >= settings.risk.min_profit_usd:
+                if gross_profit >= min_profit_usd:
                     arbs.append(
                         CrossExchangeArb(
                             event_key=event_key,
@@ -136,7 +155,7 @@ def detect_arbs(
             
             if edge_bps > 0 and actual_notional > 0:
                 gross_profit = edge_bps / 10000.0 * actual_notional
-                if gross_profit >= settings.risk.min_profit_usd:
+                if gross_profit >= min_profit_usd:
                     arbs.append(
                         CrossExchangeArb(
                             event_key=event_key,
@@ -217,77 +236,87 @@ def detect_two_buy_arbs(
     return results
 
 
-def detect_arbs_with_matcher(
-    kalshi_quotes: Iterable[MarketQuote],
-    polymarket_quotes: Iterable[MarketQuote],
-    similarity_threshold: float = 0.78,
+def _event_key(e: str) -> str:
+    # Interned so the YES/NO quotes of an event and the matcher's output share
+    # one key object: dict lookups hit on identity with the hash already cached
+    return sys.intern(e.lower().strip())
+
+
+def index_quotes_by_event(quotes: Iterable[MarketQuote]) -> dict[str, dict[str, MarketQuote]]:
+    """Index quotes as normalized event title -> outcome -> quote."""
+    from collections import defaultdict
+
+    by_event: dict[str, dict[str, MarketQuote]] = defaultdict(dict)
+    for q in quotes:
+        by_event[_event_key(q.event)][q.outcome] = q
+    return by_event
+
+
+def match_events_by_similarity(
+    kalshi_events: Iterable[str],
+    polymarket_events: Iterable[str],
     explicit_map: dict[str, str] | None = None,
-) -> List[CrossExchangeArb]:
-    """Detect cross-exchange arbs using fuzzy event matching.
+    min_score: float = 0.0,
+) -> dict[str, tuple[str, float]]:
+    """Return the best Polymarket event for each Kalshi event with its score.
 
-    This pairs events by text similarity (via `EventMatcher`) and then applies the
-    same pricing logic as `detect_arbs`.
+    Keys and values are normalized event titles. Scores do not depend on any
+    threshold, so callers sweeping thresholds can compute this once and filter.
+    Fuzzy matches scoring below `min_score` are dropped, which lets the scorer
+    skip them early. Explicit mappings are always kept and carry an infinite score.
     """
-    from collections import defaultdict
-    from app.core.matching import EventMatcher
+    import numpy as np
 
-    # Index quotes by event and outcome for both exchanges
-    def key_event(e: str) -> str:
-        return e.lower().strip()
+    from app.utils.text import numbers_compatible_mask, similarity_matrix
 
-    k_by_event: dict[str, dict[str, MarketQuote]] = defaultdict(dict)
-    p_by_event: dict[str, dict[str, MarketQuote]] = defaultdict(dict)
-    unique_k_events: set[str] = set()
-    unique_p_events: set[str] = set()
-    for q in kalshi_quotes:
-        k_by_event[key_event(q.event)][q.outcome] = q
-        unique_k_events.add(q.event)
-    for q in polymarket_quotes:
-        p_by_event[key_event(q.event)][q.outcome] = q
-        unique_p_events.add(q.event)
-
-    # Build fuzzy mapping from Kalshi -> best Polymarket event
-    matcher = EventMatcher(explicit_map=explicit_map or {}, threshold=similarity_threshold)
-    # The build_candidates in our matcher expects quotes; create lightweight quotes containing events
-    from app.core.models import MarketQuote as MQ
-    candidates = matcher.build_candidates(
-        [MQ("kalshi", "", q.event, "YES", 0.0, 0.0) for q in kalshi_quotes],
-        [MQ("polymarket", "", q.event, "YES", 0.0, 0.0) for q in polymarket_quotes],
-    )
-    # Also do a local fuzzy pass to build a mapping dict
-    from app.utils.text import similarity
-    from app.utils.text import extract_numbers_window
+    unique_k_events = list(dict.fromkeys(kalshi_events))
+    unique_p_events = list(dict.fromkeys(polymarket_events))
 
-    mapping: dict[str, str] = {}
+    scored: dict[str, tuple[str, float]] = {}
     # Start with explicit mapping if provided
     if explicit_map:
         for k, v in explicit_map.items():
-            mapping[key_event(k)] = key_event(v)
-    # Add best fuzzy matches with a number-aware guard: if both events contain
-    # numeric windows (e.g., years, thresholds), only accept if those windows match.
-    for ek in unique_k_events:
-        if key_event(ek) in mapping:
+            scored[_event_key(k)] = (_event_key(v), math.inf)
+    if not unique_k_events or not unique_p_events:
+        return scored
+
+    scores = similarity_matrix(unique_k_events, unique_p_events, score_cutoff=min_score)
+    # Number-aware guard: if both events contain numeric windows (e.g., years,
+    # thresholds), only accept if those windows match.
+    ok = numbers_compatible_mask(unique_k_events, unique_p_events)
+    scores = np.where(ok, scores, -1.0)
+    best_idx = scores.argmax(axis=1)
+    best_sim = scores[np.arange(len(unique_k_events)), best_idx]
+    for ek, j, s in zip(unique_k_events, best_idx.tolist(), best_sim.tolist()):
+        if s < 0.0 or s < min_score:
             continue
-        best_sim = -1.0
-        best_ep = None
-        for ep in unique_p_events:
-            s = similarity(ek, ep)
-            # Number-aware guard
-            nums_k = extract_numbers_window(ek)
-            nums_p = extract_numbers_window(ep)
-            if nums_k and nums_p and nums_k != nums_p:
-                # Require matching numeric windows when both sides provide them
-                continue
-            if s > best_sim:
-                best_sim = s
-                best_ep = ep
-        if best_ep and best_sim >= similarity_threshold:
-            mapping[key_event(ek)] = key_event(best_ep)
-
-    # For mapped pairs, compute arbs like in detect_arbs
+        ek_key = _event_key(ek)
+        prev = scored.get(ek_key)
+        if prev is None or s > prev[1]:
+            scored[ek_key] = (_event_key(unique_p_events[j]), s)
+    return scored
+
+
+def detect_arbs_for_pairs(
+    k_by_event: dict[str, dict[str, MarketQuote]],
+    p_by_event: dict[str, dict[str, MarketQuote]],
+    mapping: dict[str, str],
+    *,
+    total_bps: float | None = None,
+    min_profit_usd: float | None = None,
+) -> List[CrossExchangeArb]:
+    """Compute cross-exchange arbs for already matched event pairs.
+
+    `k_by_event`/`p_by_event` come from `index_quotes_by_event` and `mapping`
+    maps normalized Kalshi titles to normalized Polymarket titles. `total_bps`
+    and `min_profit_usd` default to the current settings, as in `detect_arbs`.
+    """
     arbs: List[CrossExchangeArb] = []
     # Account for both taker and slippage bps (consistent with detect_arbs)
-    total_bps = settings.fees.taker_bps + settings.risk.slippage_bps
+    if total_bps is None:
+        total_bps = settings.fees.taker_bps + settings.risk.slippage_bps
+    if min_profit_usd is None:
+        min_profit_usd = settings.risk.min_profit_usd
 
     for ek_key, ep_key in mapping.items():
         k = k_by_event.get(ek_key)
@@ -304,7 +333,7 @@ def detect_arbs_with_matcher(
                     settings.risk.max_notional_per_leg,
                 )
                 gross_profit = edge_bps / 10000.0 * max_notional
-                if gross_profit >= settings.risk.min_profit_usd:
+                if gross_profit >= min_profit_usd:
                     arbs.append(
                         CrossExchangeArb(
                             event_key=f"{k['YES'].event} <-> {p['NO'].event}",
@@ -325,7 +354,7 @@ def detect_arbs_with_matcher(
                     settings.risk.max_notional_per_leg,
                 )
                 gross_profit = edge_bps / 10000.0 * max_notional
-                if gross_profit >= settings.risk.min_profit_usd:
+                if gross_profit >= min_profit_usd:
                     arbs.append(
                         CrossExchangeArb(
                             event_key=f"{p['YES'].event} <-> {k['NO'].event}",
@@ -338,3 +367,29 @@ def detect_arbs_with_matcher(
                     )
 
     return arbs
+
+
+def detect_arbs_with_matcher(
+    kalshi_quotes: Iterable[MarketQuote],
+    polymarket_quotes: Iterable[MarketQuote],
+    similarity_threshold: float = 0.78,
+    explicit_map: dict[str, str] | None = None,
+) -> List[CrossExchangeArb]:
+    """Detect cross-exchange arbs using fuzzy event matching.
+
+    This pairs events by text similarity (see `match_events_by_similarity`) and
+    then applies the same pricing logic as `detect_arbs`.
+    """
+    kalshi_quotes = list(kalshi_quotes)
+    polymarket_quotes = list(polymarket_quotes)
+    scored = match_events_by_similarity(
+        (q.event for q in kalshi_quotes),
+        (q.event for q in polymarket_quotes),
+        explicit_map=explicit_map,
+    )
+    mapping = {ek: ep for ek, (ep, score) in scored.items() if score >= similarity_threshold}
+    return detect_arbs_for_pairs(
+        index_quotes_by_event(kalshi_quotes),
+        index_quotes_by_event(polymarket_quotes),
+        mapping,
+    )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Iterable, List, Dict, Tuple, Callable, Optional, Set
+import re
 
 import numpy as np
 
@@ -9,10 +10,12 @@ from app.utils.text import extract_numbers_window, extract_entity_tokens, extrac
 from app.utils.emb_cache import embed_texts_openai_cached
 
 
+_TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+
+
 def _tokens(text: str) -> Set[str]:
-    import re
     t = text.lower()
-    return set(re.findall(r"[a-z0-9]{3,}", t))
+    return set(_TOKEN_RE.findall(t))
 
 
 def _normalize(v: np.ndarray) -> np.ndarray:
@@ -20,12 +23,24 @@ def _normalize(v: np.ndarray) -> np.ndarray:
     return v / n
 
 
+# Polymarket events scored per matrix product; bounds the (block, n_kalshi) buffer
+_SIM_BLOCK = 512
+
+
+def _block_sims(p_vecs: np.ndarray, k_vecs: np.ndarray, start: int) -> np.ndarray:
+    """Cosine scores of Polymarket rows `start:start+_SIM_BLOCK` against all Kalshi rows.
+
+    One float32 GEMM per block replaces a gather plus GEMV per event.
+    """
+    return p_vecs[start : start + _SIM_BLOCK] @ k_vecs.T
+
+
 async def _embed_events(
     kalshi_events: List[str],
     poly_events: List[str],
     model: str = "text-embedding-3-small",
     progress_cb: Optional[Callable[[float], None]] = None,
-) -> Tuple[np.ndarray, np.ndarray, Dict[str, int], Dict[str, int]]:
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, int]]:
     # Embed with cache (asynchronous)
     def _merge(vmap: Dict[str, np.ndarray], keys: List[str]) -> np.ndarray:
         arr = np.stack([vmap[k] for k in keys]).astype(np.float32)
@@ -40,8 +55,7 @@ async def _embed_events(
     k_vecs = _merge(k_map, kalshi_events)
     p_vecs = _merge(p_map, poly_events)
     k_index = {e: i for i, e in enumerate(kalshi_events)}
-    p_index = {e: i for i, e in enumerate(poly_events)}
-    return k_vecs, p_vecs, k_index, p_index
+    return k_vecs, p_vecs, k_index
 
 
 async def build_embedding_candidates_async(
@@ -76,13 +90,16 @@ async def build_embedding_candidates_async(
             nums_to_k.setdefault(nums, set()).add(ek)
 
     # Embed all events (cached)
-    k_vecs, p_vecs, k_index, p_index = await _embed_events(k_events, p_events, model=model, progress_cb=progress_cb)
+    k_vecs, p_vecs, k_index = await _embed_events(k_events, p_events, model=model, progress_cb=progress_cb)
     if progress_cb:
         progress_cb(0.84)
 
     candidates: List[MatchCandidate] = []
     total = max(1, len(p_events))
+    sims_block = None
     for i, ep in enumerate(p_events):
+        if i % _SIM_BLOCK == 0:
+            sims_block = _block_sims(p_vecs, k_vecs, i)
         # Candidate Kalshi set by token overlap
         cand: Set[str] = set()
         toks = _tokens(ep)
@@ -106,10 +123,8 @@ async def build_embedding_candidates_async(
         # Compute cosine similarities for this Polymarket event against the candidate Kalshi set
         if not cand:
             continue
-        v_p = p_vecs[p_index[ep]][None, :]  # shape (1, d)
         idxs = np.array([k_index[ek] for ek in cand], dtype=np.int32)
-        mat = k_vecs[idxs]  # shape (m, d)
-        sims = (v_p @ mat.T).astype(np.float32).ravel()  # cosine since normalized
+        sims = sims_block[i % _SIM_BLOCK, idxs]  # cosine since normalized
         if sims.size == 0:
             continue
         # Select top-k above threshold
@@ -166,11 +181,14 @@ async def build_event_mapping_by_embeddings(
             nums_to_k.setdefault(nums, set()).add(ek)
 
     # Embeddings (cached)
-    k_vecs, p_vecs, k_index, p_index = await _embed_events(k_events, p_events, model=model, progress_cb=progress_cb)
+    k_vecs, p_vecs, k_index = await _embed_events(k_events, p_events, model=model, progress_cb=progress_cb)
 
     mapping: Dict[str, str] = {}
     total = max(1, len(p_events))
+    sims_block = None
     for i, ep in enumerate(p_events):
+        if i % _SIM_BLOCK == 0:
+            sims_block = _block_sims(p_vecs, k_vecs, i)
         # Candidate Kalshi events for this Polymarket event
         cand: Set[str] = set()
         toks = _tokens(ep)
@@ -185,10 +203,8 @@ async def build_event_mapping_by_embeddings(
         if not cand:
             continue
 
-        v_p = p_vecs[p_index[ep]][None, :]
         idxs = np.array([k_index[ek] for ek in cand], dtype=np.int32)
-        mat = k_vecs[idxs]
-        sims = (v_p @ mat.T).astype(np.float32).ravel()
+        sims = sims_block[i % _SIM_BLOCK, idxs]
         if sims.size == 0:
             continue
         j = int(np.argmax(sims))
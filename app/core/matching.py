@@ -17,7 +17,10 @@ from typing import Dict, Iterable, List, Tuple, Callable, Optional, Set
 import re
 
 from app.core.models import MarketQuote, MatchCandidate
-from app.utils.text import similarity, extract_numbers_window, extract_entity_tokens, extract_yis_actor_subject
+from app.utils.text import similarity_matrix, extract_numbers_window, extract_entity_tokens, extract_yis_actor_subject
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
 
 
 def _tokens(text: str) -> Set[str]:
@@ -30,7 +33,7 @@ def _tokens(text: str) -> Set[str]:
         Set of lowercase alphanumeric tokens of length >= 3
     """
     t = text.lower()
-    return set(re.findall(r"[a-z0-9]{3,}", t))
+    return set(_TOKEN_RE.findall(t))
 
 
 class EventMatcher:
@@ -111,9 +114,13 @@ class EventMatcher:
                     return len(ents_k & ents_p) if ents_k and ents_p else 0
                 cand = set(sorted(cand, key=_score, reverse=True)[:max_targets_per_source])
 
-            for ep in cand:
+            # Score all candidates for this source in one batched call
+            cand_list = list(cand)
+            sims = similarity_matrix([ek], cand_list)[0].tolist() if cand_list else []
+            for ep, s in zip(cand_list, sims):
                 # Prefer explicit mapping when provided
-                s = 1.0 if target and ep.lower() == target.lower() else similarity(ek, ep)
+                if target and ep.lower() == target.lower():
+                    s = 1.0
                 # Special-case: require exact subject match for Google "Year in Search" Actors
                 subj_k = extract_yis_actor_subject(ek)
                 subj_p = extract_yis_actor_subject(ep)
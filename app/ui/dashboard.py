@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import asyncio
-from dataclasses import asdict
+import atexit
+from dataclasses import replace
+import heapq
+import itertools
 from typing import List
 import json
+import math
+import re
 from pathlib import Path
 import sys
 import os
@@ -13,40 +18,127 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 if str(PROJECT_ROOT) not in sys.path:
     sys.path.insert(0, str(PROJECT_ROOT))
 
+import numpy as np
+import pandas as pd
 import streamlit as st
 import time
+import weakref
 
 from app.connectors.demo import fetch_kalshi_demo, fetch_polymarket_demo
-from app.core.arb import detect_arbs, detect_two_buy_arbs, detect_arbs_with_matcher, compute_edge_bps, compute_arb_percentage, calculate_profit_for_budget
+from app.core.arb import detect_arbs, detect_two_buy_arbs, detect_arbs_for_pairs, index_quotes_by_event, match_events_by_similarity, compute_edge_bps, compute_arb_percentage, calculate_profit_for_budget
 from app.config.settings import settings
 from app.core.models import CrossExchangeArb, TwoBuyArb, MarketQuote as MQ
-from app.core.matching import EventMatcher
-from app.core.embedding_matcher import build_embedding_candidates_async
-from app.utils.text import similarity, extract_numbers_window
-from app.utils.ml_match import build_tfidf_map
-from app.utils.embeddings import build_embedding_map_openai
-from app.utils.llm_validate import validate_pairs_openai
-from app.utils.timing import TimingTracker, timer
-from app.utils.links import get_event_link, polymarket_market_url, kalshi_market_url
-from app.utils.date_filter import filter_by_days_until_resolution, format_resolution_date
-from app.utils.liquidity_filter import filter_by_liquidity, get_liquidity_summary
-from app.utils.slippage_protection import cap_order_by_liquidity
+from app.utils.text import extract_entity_tokens, similarity_matrix
+from app.utils.timing import TimingTracker
+from app.utils.links import polymarket_market_url, kalshi_market_url
+from app.utils.date_filter import filter_by_days_until_resolution
+from app.utils.liquidity_filter import filter_by_liquidity
 
 
 st.set_page_config(page_title="Polymarket–Kalshi Arbitrage", layout="wide")
 st.title("Polymarket–Kalshi Arbitrage Dashboard")
 
 
-@st.cache_data(ttl=5)
+@st.cache_resource(show_spinner=False)
+def _session_loops() -> "weakref.WeakSet[asyncio.AbstractEventLoop]":
+    """Process-wide weak registry of session loops, closed by one atexit hook.
+
+    Held in `cache_resource` because the script body re-runs on every rerun;
+    loops of ended sessions drop out once their session state is collected.
+    """
+    loops: weakref.WeakSet[asyncio.AbstractEventLoop] = weakref.WeakSet()
+
+    def _close_all() -> None:
+        for loop in list(loops):
+            if not loop.is_closed():
+                loop.close()
+
+    atexit.register(_close_all)
+    return loops
+
+
+def _loop() -> asyncio.AbstractEventLoop:
+    """Per-session event loop reused across reruns instead of `asyncio.run`."""
+    loop = st.session_state.get("loop")
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        st.session_state["loop"] = loop
+        _session_loops().add(loop)
+    return loop
+
+
+class _DebouncedProgress:
+    """Progress-bar proxy that debounces per-step updates.
+
+    Every update is a websocket message to the browser; tight loops and
+    per-batch callbacks would otherwise flood it, so `update` pushes at most
+    one value per `interval` seconds (completion, 100, always goes through).
+    `progress` is for stage milestones and always pushes, so the bar is never
+    left stale before a long blocking step.
+    """
+
+    def __init__(self, bar, interval: float = 0.1):
+        self._bar = bar
+        self._interval = interval
+        self._last = -math.inf
+
+    def progress(self, value: int):
+        self._last = time.monotonic()
+        self._bar.progress(value)
+
+    def update(self, value: int) -> bool:
+        """Push `value` unless one was pushed within `interval`; return whether it was."""
+        if value >= 100 or time.monotonic() - self._last >= self._interval:
+            self.progress(value)
+            return True
+        return False
+
+
+# TF-IDF cosine at or above which an auto-alias pair is accepted without
+# asking the OpenAI embeddings
+TFIDF_ALIAS_MIN_SIMILARITY = 0.7
+
+
+def _drop_entity_mismatches(alias_map: dict[str, tuple[str, float]]) -> dict[str, tuple[str, float]]:
+    """Drop alias pairs whose titles both name entities but share none.
+
+    Guards against mapping different people onto each other. Many sources can
+    share a target, so entities are extracted once per title.
+    """
+    ents_by_title = {
+        t: extract_entity_tokens(t)
+        for t in {*alias_map, *(tgt for tgt, _ in alias_map.values())}
+    }
+    kept: dict[str, tuple[str, float]] = {}
+    for src, (tgt, score) in alias_map.items():
+        ents_s = ents_by_title[src]
+        ents_t = ents_by_title[tgt]
+        if ents_s and ents_t and not (ents_s & ents_t):
+            continue
+        kept[src] = (tgt, score)
+    return kept
+
+
+# Cache-key hashing for quotes passed to cached helpers: a plain tuple of the
+# fields those helpers read, so a price tick still invalidates the entry but
+# Streamlit does not pickle every dataclass on each lookup.
+_MQ_HASH_FUNCS = {MQ: lambda q: (q.exchange, q.market_id, q.event, q.outcome, q.price, q.size, q.end_date)}
+
+
+# Loaders use cache_resource: the quote tuples are returned by reference
+# rather than pickled and unpickled on every cache hit. Tuples keep the
+# shared snapshot from being mutated by callers.
+@st.cache_resource(ttl=15, show_spinner=False)
 def load_quotes_sync():
     # Bridge async demo fetchers into Streamlit
     async def _run():
         return await asyncio.gather(fetch_kalshi_demo(), fetch_polymarket_demo())
 
-    return asyncio.run(_run())
+    k, p = _loop().run_until_complete(_run())
+    return tuple(k), tuple(p)
 
 
-@st.cache_data(ttl=5)
+@st.cache_resource(ttl=5, show_spinner=False)
 def load_quotes_live_sync():
     async def _run():
         from app.connectors.kalshi import KalshiClient
@@ -64,54 +156,179 @@ def load_quotes_live_sync():
                 base_url=os.getenv("POLYMARKET_BASE_URL"),
                 api_key=os.getenv("POLYMARKET_API_KEY"),
             )
+        # Fetch both exchanges concurrently so latency is the slower of the two
+        # rather than their sum
         try:
-            k = await kalshi.fetch_quotes()
+            k, p = await asyncio.gather(
+                kalshi.fetch_quotes(),
+                poly.fetch_quotes() if poly else asyncio.sleep(0, result=[]),
+                return_exceptions=True,
+            )
         finally:
-            await kalshi.close()
-        if poly:
-            try:
-                p = await poly.fetch_quotes()
-            finally:
-                await poly.close()
-        else:
+            await asyncio.gather(kalshi.close(), *([poly.close()] if poly else []))
+        if isinstance(k, BaseException):
+            raise k
+        if isinstance(p, BaseException):
+            from app.utils.logging import get_logger
+
+            get_logger(__name__).warning("Polymarket fetch failed: %s", p)
             p = []
-        return k, p
+        return tuple(k), tuple(p)
+
+    return _loop().run_until_complete(_run())
+
+
+@st.cache_data(ttl=5, max_entries=32, show_spinner=False, hash_funcs=_MQ_HASH_FUNCS)
+def _filter_dates_cached(quotes: tuple[MQ, ...], min_days: int, max_days: int) -> tuple[MQ, ...]:
+    """`filter_by_days_until_resolution`, skipped on reruns that leave quotes and bounds unchanged."""
+    return tuple(filter_by_days_until_resolution(list(quotes), min_days=min_days, max_days=max_days))
+
+
+@st.cache_data(ttl=5, max_entries=32, show_spinner=False, hash_funcs=_MQ_HASH_FUNCS)
+def _filter_liquidity_cached(
+    quotes: tuple[MQ, ...], require_both_outcomes: bool, min_price: float, min_size: float
+) -> tuple[MQ, ...]:
+    """`filter_by_liquidity`, skipped on reruns that leave quotes and settings unchanged."""
+    return tuple(
+        filter_by_liquidity(
+            list(quotes), require_both_outcomes=require_both_outcomes, min_price=min_price, min_size=min_size
+        )
+    )
+
+
+@st.cache_data(ttl=5, max_entries=32, show_spinner=False, hash_funcs=_MQ_HASH_FUNCS)
+def _two_buy_cached(
+    kalshi_quotes: tuple[MQ, ...],
+    poly_quotes: tuple[MQ, ...],
+    taker_bps: float,
+    slippage_bps: float,
+    max_notional_per_leg: float,
+    min_profit_usd: float,
+) -> List[TwoBuyArb]:
+    """`detect_two_buy_arbs`, keyed on the quotes plus every setting it reads
+    (fees, slippage, per-leg notional and the min-profit filter)."""
+    return detect_two_buy_arbs(kalshi_quotes, poly_quotes)
+
+
+def _event_tuple(quotes: List[MQ]) -> tuple[str, ...]:
+    """Unique event titles in first-seen order, as a hashable cache key."""
+    return tuple(dict.fromkeys(q.event for q in quotes))
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _best_candidates(
+    k_events: tuple[str, ...],
+    p_events: tuple[str, ...],
+    explicit_items: tuple[tuple[str, str], ...],
+    max_targets_per_source: int = 40,
+) -> list[tuple[str, float]]:
+    """Best `(event_key, similarity)` per Kalshi event from `EventMatcher.build_candidates`.
+
+    No threshold is applied: each source's best match does not depend on it,
+    so one cached run serves every threshold the user tries.
+    """
+    from app.core.matching import EventMatcher
+
+    matcher = EventMatcher(explicit_map=dict(explicit_items), threshold=-math.inf)
+    cands = matcher.build_candidates(
+        [MQ("kalshi", "", e, "YES", 0.0, 0.0) for e in k_events],
+        [MQ("polymarket", "", e, "YES", 0.0, 0.0) for e in p_events],
+        max_targets_per_source=max_targets_per_source,
+    )
+    return [(c.event_key, c.similarity) for c in cands]
+
+
+def _cached_candidates(
+    k_events: tuple[str, ...],
+    p_events: tuple[str, ...],
+    explicit_items: tuple[tuple[str, str], ...],
+    threshold: float,
+    max_targets_per_source: int = 40,
+) -> list[tuple[str, float]]:
+    """Return `(event_key, similarity)` pairs scoring at least `threshold`.
+
+    Inputs are plain tuples so reruns with unchanged events and alias map are
+    served from the `_best_candidates` cache, whatever the threshold.
+    """
+    best = _best_candidates(k_events, p_events, explicit_items, max_targets_per_source)
+    return [(key, sim) for key, sim in best if sim >= threshold]
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def _cached_match_scores(
+    k_events: tuple[str, ...],
+    p_events: tuple[str, ...],
+    explicit_items: tuple[tuple[str, str], ...],
+) -> dict[str, tuple[str, float]]:
+    """Threshold-independent best-match scores, see `match_events_by_similarity`.
+
+    Pairs below the lowest threshold the slider or auto-sweep can pick are dropped.
+    """
+    return match_events_by_similarity(
+        k_events, p_events, explicit_map=dict(explicit_items), min_score=0.6
+    )
+
+
+@st.cache_data(ttl=30, show_spinner=False, hash_funcs=_MQ_HASH_FUNCS)
+def _price_table(quotes: List[MQ]) -> tuple[dict[str, int], np.ndarray, np.ndarray]:
+    """Struct-of-arrays price lookup: event -> row id plus YES/NO price columns.
+
+    Missing outcomes are NaN so they propagate through the edge math. One extra
+    all-NaN row at index `len(event_to_id)` serves lookups of unknown events.
+    """
+    event_to_id: dict[str, int] = {}
+    for q in quotes:
+        event_to_id.setdefault(q.event, len(event_to_id))
+    yes = np.full(len(event_to_id) + 1, np.nan)
+    no = np.full(len(event_to_id) + 1, np.nan)
+    for q in quotes:
+        if q.outcome == "YES":
+            yes[event_to_id[q.event]] = q.price
+        elif q.outcome == "NO":
+            no[event_to_id[q.event]] = q.price
+    return event_to_id, yes, no
+
 
-    return asyncio.run(_run())
+def _nan_to_none(arr: np.ndarray, ndigits: int) -> list:
+    """Round a price/edge column for display, showing missing values as None."""
+    return [None if np.isnan(v) else round(v, ndigits) for v in arr.tolist()]
+
+
+def _market_url(q: MQ) -> str:
+    return kalshi_market_url(q.market_id) if q.exchange == "kalshi" else polymarket_market_url(q.market_id)
 
 
 def render_cross_arbs(arbs: List[CrossExchangeArb], budget: float = 1000.0):
     if not arbs:
         st.info("No cross-exchange opportunities found.")
         return
-    rows = []
-    for a in arbs:
-        # Calculate profit for given budget
-        arb_pct = compute_arb_percentage(a.edge_bps)
-        notional, stake_long, stake_short, profit = calculate_profit_for_budget(
-            a.edge_bps, a.max_notional, budget
-        )
-        
-        # Generate links
-        long_link = kalshi_market_url(a.long.market_id) if a.long.exchange == "kalshi" else polymarket_market_url(a.long.market_id)
-        short_link = kalshi_market_url(a.short.market_id) if a.short.exchange == "kalshi" else polymarket_market_url(a.short.market_id)
-        
-        # Format strategy string with links
-        strategy = f"Buy {a.long.outcome} on [{a.long.exchange}]({long_link}) @ ${a.long.price:.3f}\n" \
-                   f"Buy {a.short.outcome} on [{a.short.exchange}]({short_link}) @ ${a.short.price:.3f}"
-        
-        rows.append(
-            {
-                "event": a.event_key,
-                "arb %": f"{arb_pct:.2f}%",
-                "profit": f"${profit:.2f}",
-                "stake": f"${notional:.2f}",
-                "strategy": strategy,
-                "view long": long_link,
-                "view short": short_link,
-            }
-        )
-    
+    # Profit for the given budget, for all arbs at once
+    edge_bps = np.array([a.edge_bps for a in arbs], dtype=np.float64)
+    max_notional = np.array([a.max_notional for a in arbs], dtype=np.float64)
+    notional, _, _, profit = calculate_profit_for_budget(edge_bps, max_notional, budget)
+    arb_pct = compute_arb_percentage(edge_bps)
+
+    # Generate links
+    long_links = [_market_url(a.long) for a in arbs]
+    short_links = [_market_url(a.short) for a in arbs]
+
+    # Build columns directly so Streamlit converts one DataFrame instead of a list of dicts
+    rows = pd.DataFrame(
+        {
+            "event": [a.event_key for a in arbs],
+            "arb %": [f"{v:.2f}%" for v in arb_pct.tolist()],
+            "profit": [f"${v:.2f}" for v in profit.tolist()],
+            "stake": [f"${v:.2f}" for v in notional.tolist()],
+            "strategy": [
+                f"Buy {a.long.outcome} on [{a.long.exchange}]({ll}) @ ${a.long.price:.3f}\n"
+                f"Buy {a.short.outcome} on [{a.short.exchange}]({sl}) @ ${a.short.price:.3f}"
+                for a, ll, sl in zip(arbs, long_links, short_links)
+            ],
+            "view long": long_links,
+            "view short": short_links,
+        }
+    )
+
     # Display as dataframe with clickable links
     df = st.dataframe(rows, width='stretch', hide_index=True, column_config={
         "view long": st.column_config.LinkColumn("Long Market", display_text="🔗 Open"),
@@ -119,26 +336,90 @@ def render_cross_arbs(arbs: List[CrossExchangeArb], budget: float = 1000.0):
     })
 
 
+@st.fragment
+def render_cross_arbs_with_budget(arbs: List[CrossExchangeArb]):
+    """Budget input and cross-arb table as one fragment.
+
+    Editing the budget only reruns this function with the last detected arbs,
+    instead of rerunning loading, matching and detection for the whole page.
+    """
+    budget = st.number_input(
+        "Budget ($)", min_value=10.0, max_value=100000.0, value=1000.0, step=50.0, key="budget"
+    )
+    render_cross_arbs(arbs, budget=budget)
+
+
 def render_two_buy(arbs: List[TwoBuyArb]):
     if not arbs:
         st.info("No two-buy opportunities found.")
         return
-    rows = []
-    for a in arbs:
-        rows.append(
-            {
-                "event": a.event_key,
-                "buy_yes@exch": f"{a.buy_yes.exchange}@{a.buy_yes.price:.2f}",
-                "buy_no@exch": f"{a.buy_no.exchange}@{a.buy_no.price:.2f}",
-                "sum_price": round(a.sum_price, 2),
-                "edge_bps": round(a.edge_bps, 1),
-                "contracts": round(a.contracts, 4),
-                "gross_profit_usd": round(a.gross_profit_usd, 2),
-            }
-        )
+    rows = [
+        {
+            "event": a.event_key,
+            "buy_yes@exch": f"{a.buy_yes.exchange}@{a.buy_yes.price:.2f}",
+            "buy_no@exch": f"{a.buy_no.exchange}@{a.buy_no.price:.2f}",
+            "sum_price": round(a.sum_price, 2),
+            "edge_bps": round(a.edge_bps, 1),
+            "contracts": round(a.contracts, 4),
+            "gross_profit_usd": round(a.gross_profit_usd, 2),
+        }
+        for a in arbs
+    ]
     st.dataframe(rows, width='stretch', hide_index=True)
 
 
+def _pair_price_rows(pairs: list[tuple[str, str, str, float]], kalshi_quotes: List[MQ], poly_quotes: List[MQ]) -> list[dict]:
+    """Candidate-table rows: both sides' prices and the two hedge edges.
+
+    `pairs` holds `(label, kalshi_event, polymarket_event, similarity)`. Prices
+    come from the cached `_price_table` columns and edges are computed for all
+    rows at once.
+    """
+    k_ids, k_yes_all, k_no_all = _price_table(kalshi_quotes)
+    p_ids, p_yes_all, p_no_all = _price_table(poly_quotes)
+    k_rows = [k_ids.get(ek, len(k_ids)) for _, ek, _, _ in pairs]
+    p_rows = [p_ids.get(ep, len(p_ids)) for _, _, ep, _ in pairs]
+    k_yes, k_no = k_yes_all[k_rows], k_no_all[k_rows]
+    p_yes, p_no = p_yes_all[p_rows], p_no_all[p_rows]
+    total_bps = settings.fees.taker_bps + settings.risk.slippage_bps
+    edge_a = compute_edge_bps(k_yes, p_no) - total_bps
+    edge_b = compute_edge_bps(p_yes, k_no) - total_bps
+    return [
+        {
+            "pair": label,
+            "similarity": round(float(sim), 3),
+            "K YES": ky,
+            "K NO": kn,
+            "P YES": py,
+            "P NO": pn,
+            "edge_bps K_yes+P_no": ea,
+            "edge_bps P_yes+K_no": eb,
+        }
+        for (label, _, _, sim), ky, kn, py, pn, ea, eb in zip(
+            pairs,
+            _nan_to_none(k_yes, 3),
+            _nan_to_none(k_no, 3),
+            _nan_to_none(p_yes, 3),
+            _nan_to_none(p_no, 3),
+            _nan_to_none(edge_a, 1),
+            _nan_to_none(edge_b, 1),
+        )
+    ]
+
+
+# Diagnostics lists each hedge's two legs next to its edge
+_DIAG_COLUMNS = (
+    "pair",
+    "similarity",
+    "K YES",
+    "P NO",
+    "edge_bps K_yes+P_no",
+    "P YES",
+    "K NO",
+    "edge_bps P_yes+K_no",
+)
+
+
 def build_match_candidate_rows(
     kalshi_quotes: List[MQ],
     poly_quotes: List[MQ],
@@ -150,92 +431,37 @@ def build_match_candidate_rows(
     This is useful to debug whether our event matching works independently of
     arbitrage profitability.
     """
-    matcher = EventMatcher(explicit_map=explicit_map or {}, threshold=threshold)
-    # Build lightweight quotes for candidate generation
-    cands = matcher.build_candidates(
-        [MQ("kalshi", "", q.event, "YES", 0.0, 0.0) for q in kalshi_quotes],
-        [MQ("polymarket", "", q.event, "YES", 0.0, 0.0) for q in poly_quotes],
+    cands = _cached_candidates(
+        _event_tuple(kalshi_quotes),
+        _event_tuple(poly_quotes),
+        tuple((explicit_map or {}).items()),
+        float(threshold),
     )
 
-    # Build price lookup by event/outcome for quick edge preview
-    from collections import defaultdict
-
-    def _by_event(quotes: List[MQ]):
-        d = defaultdict(dict)
-        for q in quotes:
-            d[q.event][q.outcome] = q
-        return d
-
-    k_by = _by_event(kalshi_quotes)
-    p_by = _by_event(poly_quotes)
-
-    rows = []
-    total_bps = settings.fees.taker_bps + settings.risk.slippage_bps
-    for c in sorted(cands, key=lambda x: x.similarity, reverse=True):
-        try:
-            ek, ep = c.event_key.split(" <-> ", 1)
-        except ValueError:
-            ek, ep = c.event_key, ""
-        kq = k_by.get(ek, {})
-        pq = p_by.get(ep, {})
-        edge_a = None
-        edge_b = None
-        if "YES" in kq and "NO" in pq:
-            edge_a = compute_edge_bps(kq["YES"].price, pq["NO"].price) - total_bps
-        if "YES" in pq and "NO" in kq:
-            edge_b = compute_edge_bps(pq["YES"].price, kq["NO"].price) - total_bps
-        rows.append(
-            {
-                "pair": c.event_key,
-                "similarity": round(float(c.similarity), 3),
-                "K YES": round(kq.get("YES").price, 3) if "YES" in kq else None,
-                "K NO": round(kq.get("NO").price, 3) if "NO" in kq else None,
-                "P YES": round(pq.get("YES").price, 3) if "YES" in pq else None,
-                "P NO": round(pq.get("NO").price, 3) if "NO" in pq else None,
-                "edge_bps K_yes+P_no": round(edge_a, 1) if edge_a is not None else None,
-                "edge_bps P_yes+K_no": round(edge_b, 1) if edge_b is not None else None,
-            }
-        )
-    if rows:
-        return rows, False
+    pairs = []
+    for event_key, sim in sorted(cands, key=lambda x: x[1], reverse=True):
+        # ep is "" when the key has no separator
+        ek, _, ep = event_key.partition(" <-> ")
+        pairs.append((event_key, ek, ep, sim))
+    if pairs:
+        return _pair_price_rows(pairs, kalshi_quotes, poly_quotes), False
 
     # Lenient fallback: ignore numeric/date guard and entity overlap to surface
     # nearest neighbors by raw similarity so users can see potential pairs.
-    from app.utils.text import similarity as _sim
-
-    best_rows = []
-    for ek in {q.event for q in kalshi_quotes}:
-        best_ep = None
-        best_score = -1.0
-        for ep in {q.event for q in poly_quotes}:
-            s = float(_sim(ek, ep))
-            if s > best_score:
-                best_score = s
-                best_ep = ep
-        if best_ep is None:
-            continue
-        kq = k_by.get(ek, {})
-        pq = p_by.get(best_ep, {})
-        edge_a = edge_b = None
-        if "YES" in kq and "NO" in pq:
-            edge_a = compute_edge_bps(kq["YES"].price, pq["NO"].price) - total_bps
-        if "YES" in pq and "NO" in kq:
-            edge_b = compute_edge_bps(pq["YES"].price, kq["NO"].price) - total_bps
-        best_rows.append(
-            {
-                "pair": f"{ek} <-> {best_ep}",
-                "similarity": round(best_score, 3),
-                "K YES": round(kq.get("YES").price, 3) if "YES" in kq else None,
-                "K NO": round(kq.get("NO").price, 3) if "NO" in kq else None,
-                "P YES": round(pq.get("YES").price, 3) if "YES" in pq else None,
-                "P NO": round(pq.get("NO").price, 3) if "NO" in pq else None,
-                "edge_bps K_yes+P_no": round(edge_a, 1) if edge_a is not None else None,
-                "edge_bps P_yes+K_no": round(edge_b, 1) if edge_b is not None else None,
-            }
-        )
-    # Sort and keep a manageable number for the grid
-    best_rows.sort(key=lambda r: r["similarity"], reverse=True)
-    return best_rows[:20], True
+    uniq_k = list(dict.fromkeys(q.event for q in kalshi_quotes))
+    uniq_p = list(dict.fromkeys(q.event for q in poly_quotes))
+    if not uniq_k or not uniq_p:
+        return [], True
+    scores = similarity_matrix(uniq_k, uniq_p)
+    best_idx = scores.argmax(axis=1)
+    best_score = scores[np.arange(len(uniq_k)), best_idx]
+    # Keep a manageable number for the grid; only those rows are priced
+    top = np.argsort(-best_score, kind="stable")[:20]
+    best_pairs = [
+        (f"{uniq_k[i]} <-> {uniq_p[best_idx[i]]}", uniq_k[i], uniq_p[best_idx[i]], float(best_score[i]))
+        for i in top.tolist()
+    ]
+    return _pair_price_rows(best_pairs, kalshi_quotes, poly_quotes), True
 
 
 def render_best_cross_summary(arbs: List[CrossExchangeArb]):
@@ -298,9 +524,6 @@ with st.sidebar:
     min_profit = st.number_input("Min profit ($)", min_value=0.0, max_value=1000.0, value=float(settings.risk.min_profit_usd), step=0.5)
     auto_optimize_fees = st.checkbox("Auto-optimize risk/fees", value=True)
     
-    st.markdown("### Profit Calculator")
-    budget = st.number_input("Budget ($)", min_value=10.0, max_value=100000.0, value=1000.0, step=50.0)
-    
     st.markdown("### Date Filter")
     use_date_filter = st.checkbox("Filter by resolution date", value=False)
     if use_date_filter:
@@ -380,27 +603,24 @@ if kalshi is None or poly is None:
     st.session_state[cache_key] = (kalshi, poly)
 
 # Optional keyword filtering to increase overlap
-def _kw_ok(q):
-    if not keyword:
-        return True
-    text = q.event.lower()
-    # Match if ANY token (>=3 chars) from the keyword exists in the title
-    tokens = [t for t in keyword.lower().replace(",", " ").split() if len(t) >= 3]
-    if not tokens:
-        return True
-    return any(t in text for t in tokens)
-kalshi = [q for q in kalshi if _kw_ok(q)]
-poly = [q for q in poly if _kw_ok(q)]
+# Match if ANY token (>=3 chars) from the keyword exists in the title
+kw_tokens = [t for t in keyword.lower().replace(",", " ").split() if len(t) >= 3]
+if kw_tokens:
+    # One case-insensitive alternation searched in C per title, instead of
+    # lowercasing titles and testing each token in Python
+    kw_re = re.compile("|".join(map(re.escape, kw_tokens)), re.IGNORECASE)
+    kalshi = [q for q in kalshi if kw_re.search(q.event)]
+    poly = [q for q in poly if kw_re.search(q.event)]
 
 # Apply date filter if enabled
 if use_date_filter:
-    kalshi = filter_by_days_until_resolution(kalshi, min_days=min_days, max_days=max_days)
-    poly = filter_by_days_until_resolution(poly, min_days=min_days, max_days=max_days)
+    kalshi = _filter_dates_cached(tuple(kalshi), min_days, max_days)
+    poly = _filter_dates_cached(tuple(poly), min_days, max_days)
 
 # Apply liquidity filter if enabled
 if use_liquidity_filter:
-    kalshi = filter_by_liquidity(kalshi, require_both_outcomes=require_both_outcomes, min_price=min_price, min_size=min_size)
-    poly = filter_by_liquidity(poly, require_both_outcomes=require_both_outcomes, min_price=min_price, min_size=min_size)
+    kalshi = _filter_liquidity_cached(tuple(kalshi), require_both_outcomes, min_price, min_size)
+    poly = _filter_liquidity_cached(tuple(poly), require_both_outcomes, min_price, min_size)
 
 # Step 2: Matching trigger
 run_match = st.button("Run matching now", type="primary")
@@ -413,41 +633,61 @@ progress_bar = None
 auto_map: dict[str, str] = {}
 if auto_alias and (auto_run_match or run_match):
     if progress_bar is None:
-        progress_bar = progress_container.progress(5)
+        progress_bar = _DebouncedProgress(progress_container.progress(5))
     with st.spinner("Building alias map (titles → titles)..."):
-        unique_k_events = list({q.event for q in kalshi})
-        unique_p_events = list({q.event for q in poly})
-        def _key(e: str) -> str:
-            return e.lower().strip()
+        # Normalized key -> canonical title; titles differing only in case or
+        # surrounding whitespace are embedded once
+        k_titles_by_key = {q.event.lower().strip(): q.event for q in kalshi}
+        p_titles_by_key = {q.event.lower().strip(): q.event for q in poly}
+        k_key_by_title = {title: key for key, title in k_titles_by_key.items()}
+        unique_k_events = list(k_titles_by_key.values())
+        unique_p_events = list(p_titles_by_key.values())
         if use_openai:
+            alias_map: dict[str, tuple[str, float]] = {}
             try:
-                ml_map = build_embedding_map_openai(
-                    unique_k_events,
-                    unique_p_events,
-                    min_similarity=float(sim_thresh),
-                    strict_numbers=bool(strict_numbers),
-                    model=openai_model,
-                    progress_cb=(lambda f: progress_bar.progress(max(6, int(25 * max(0.0, min(1.0, f))))) if progress_bar else None),
+                from app.utils.ml_match import build_tfidf_map
+
+                # Titles with a confident, entity-compatible local TF-IDF match
+                # skip the OpenAI round-trip; rejected ones are still sent
+                alias_map = _drop_entity_mismatches(
+                    build_tfidf_map(
+                        unique_k_events,
+                        unique_p_events,
+                        min_similarity=max(TFIDF_ALIAS_MIN_SIMILARITY, float(sim_thresh)),
+                        strict_numbers=bool(strict_numbers),
+                    )
                 )
-                # Enforce entity/name overlap to avoid mismatching different people
-                for s_orig, (tgt, score) in ml_map.items():
-                    try:
-                        ents_s = set(extract_entity_tokens(s_orig))
-                        ents_t = set(extract_entity_tokens(tgt))
-                    except Exception:
-                        ents_s, ents_t = set(), set()
-                    if ents_s and ents_t and not (ents_s & ents_t):
-                        continue
-                    auto_map[_key(s_orig)] = tgt
             except Exception as e:  # noqa: BLE001
-                st.error(f"OpenAI embeddings failed: {e}")
-                # No fallback; leave auto_map empty per user preference
+                st.warning(f"TF-IDF pre-matching failed; sending all titles to OpenAI: {e}")
+            pending_k_events = [e for e in unique_k_events if e not in alias_map]
+            if pending_k_events:
+                try:
+                    from app.utils.embeddings import build_embedding_map_openai
+
+                    alias_map.update(
+                        _drop_entity_mismatches(
+                            build_embedding_map_openai(
+                                pending_k_events,
+                                unique_p_events,
+                                min_similarity=float(sim_thresh),
+                                strict_numbers=bool(strict_numbers),
+                                model=openai_model,
+                                progress_cb=(lambda f: progress_bar.update(max(6, int(25 * max(0.0, min(1.0, f)))))) if progress_bar else None,
+                            )
+                        )
+                    )
+                except Exception as e:  # noqa: BLE001
+                    st.error(f"OpenAI embeddings failed: {e}")
+                    # No fuzzy fallback; only the TF-IDF aliases are kept
+            for s_orig, (tgt, _score) in alias_map.items():
+                auto_map[k_key_by_title[s_orig]] = tgt
         else:
             st.info("OpenAI embeddings disabled — skipping alias map build.")
     if progress_bar is not None:
         progress_bar.progress(30)
 
-explicit_map_for_detection: dict[str, str] = {k: v for k, v in auto_map.items()} if auto_map else {}
+# Detection only reads the alias map, so share it rather than copying
+explicit_map_for_detection: dict[str, str] = auto_map
 
 # Separate tabs: Matches (fuzzy pairs), Arbitrage (cross-exchange), Two-Buy
 tab_matches, tab1, tab2 = st.tabs(["Matches", "Arbitrage (Cross-Exchange)", "Two-Buy"])
@@ -476,114 +716,119 @@ with tab1:
     if auto_run_match or run_match:
         st.session_state.timing_tracker.start("detect_arbs")
         with st.spinner("Running cross-exchange detection..."):
-            # Always use fuzzy matching to find cross-exchange opportunities
-            cross = detect_arbs_with_matcher(
-                kalshi,
-                poly,
-                similarity_threshold=sim_thresh,
-                explicit_map=explicit_map_for_detection,
+            # Always use fuzzy matching to find cross-exchange opportunities.
+            # Events are scored once; each threshold below only filters the
+            # scored pairs instead of re-running the fuzzy match.
+            match_scores = _cached_match_scores(
+                _event_tuple(kalshi),
+                _event_tuple(poly),
+                tuple(explicit_map_for_detection.items()),
             )
+            k_by_event = index_quotes_by_event(kalshi)
+            p_by_event = index_quotes_by_event(poly)
+            scored_arbs = [
+                (score, arb)
+                for ek, (ep, score) in match_scores.items()
+                for arb in detect_arbs_for_pairs(k_by_event, p_by_event, {ek: ep})
+            ]
+
+            def _arbs_at(threshold: float) -> List[CrossExchangeArb]:
+                return [a for score, a in scored_arbs if score >= threshold]
+
+            cross = _arbs_at(sim_thresh)
         chosen_thresh = sim_thresh
-        if not cross:
-            if auto_threshold:
-                trial_thresholds = [0.9, 0.85, 0.8, 0.75, 0.72, 0.7, 0.68, 0.66, 0.64, 0.62, 0.6]
-                best = []
-                for t in trial_thresholds:
-                    cand = detect_arbs_with_matcher(
-                        kalshi,
-                        poly,
-                        similarity_threshold=t,
-                        explicit_map=explicit_map_for_detection,
-                    )
-                    if cand:
-                        # pick best by max gross profit
-                        m = max(cand, key=lambda a: (a.gross_profit_usd, a.edge_bps))
-                        best.append((t, m.gross_profit_usd, cand))
-                if best:
-                    best.sort(key=lambda x: x[1], reverse=True)
-                    chosen_thresh, _, cross = best[0]
-                else:
-                    cross = []
-            else:
-                cross = detect_arbs_with_matcher(
-                    kalshi,
-                    poly,
-                    similarity_threshold=sim_thresh,
-                    explicit_map=explicit_map_for_detection,
-                )
+        if not cross and auto_threshold:
+            trial_thresholds = [0.9, 0.85, 0.8, 0.75, 0.72, 0.7, 0.68, 0.66, 0.64, 0.62, 0.6]
+            best = []
+            for t in trial_thresholds:
+                cand = _arbs_at(t)
+                if cand:
+                    # pick best by max gross profit
+                    m = max(cand, key=lambda a: (a.gross_profit_usd, a.edge_bps))
+                    best.append((t, m.gross_profit_usd, cand))
+            if best:
+                best.sort(key=lambda x: x[1], reverse=True)
+                chosen_thresh, _, cross = best[0]
         if (not cross) and search_until_found:
-            import time as _t
-            deadline = _t.time() + float(search_time_limit)
+            # Scores are already computed, so one descending pass finds the
+            # strictest threshold with any arb; repeating it cannot find more.
+            deadline = time.time() + float(search_time_limit)
             trial_thresholds = [0.9, 0.85, 0.8, 0.78, 0.75, 0.72, 0.7, 0.68, 0.66, 0.64, 0.62, 0.6]
-            i = 0
-            while _t.time() < deadline and not cross:
-                t = trial_thresholds[i % len(trial_thresholds)]
-                cand = detect_arbs_with_matcher(
-                    kalshi,
-                    poly,
-                    similarity_threshold=t,
-                    explicit_map=explicit_map_for_detection,
-                )
+            for i, t in enumerate(trial_thresholds, start=1):
+                if time.time() >= deadline:
+                    break
+                cand = _arbs_at(t)
                 if cand:
                     chosen_thresh = t
                     cross = cand
                     break
-                i += 1
                 if progress_bar is not None:
-                    progress_bar.progress(min(60 + i * 2, 64))
+                    progress_bar.update(min(60 + i * 2, 64))
         # Auto-optimize fees/min profit to surface best edge without user tuning
         chosen_fees = (settings.fees.taker_bps, settings.risk.slippage_bps, settings.risk.min_profit_usd)
         if auto_optimize_fees:
             fee_grid = [1.0, 3.0, 5.0, float(settings.fees.taker_bps)]
             slip_grid = [1.0, 3.0, 5.0, float(settings.risk.slippage_bps)]
             profit_grid = [0.0, 0.5, 1.0, float(settings.risk.min_profit_usd)]
+            # Detect once at the lowest fee+slippage with no profit floor. Fees
+            # only shift each arb's edge and min profit only filters, so every
+            # grid combination is then scored with array ops instead of re-detecting.
+            combos = list(itertools.product(fee_grid, slip_grid, profit_grid))
+            base_bps = min(tb + sb for tb, sb, _ in combos)
+            fuzzy_map = {ek: ep for ek, (ep, score) in match_scores.items() if score >= chosen_thresh}
+            raw_sets = []
+            for raw in (
+                detect_arbs(kalshi, poly, total_bps=base_bps, min_profit_usd=-math.inf),
+                detect_arbs_for_pairs(k_by_event, p_by_event, fuzzy_map, total_bps=base_bps, min_profit_usd=-math.inf),
+            ):
+                gross_bps = np.array([a.edge_bps for a in raw], dtype=np.float64) + base_bps
+                notional = np.array([a.max_notional for a in raw], dtype=np.float64)
+                raw_sets.append((raw, gross_bps, notional))
             best_profit = -1.0
             best_combo = None
-            best_cross = cross
-            # Helper to run detect with temp settings
-            def _run_with(tb, sb, mp):
-                tb0, sb0, mp0 = settings.fees.taker_bps, settings.risk.slippage_bps, settings.risk.min_profit_usd
-                try:
-                    settings.fees.taker_bps = float(tb)
-                    settings.risk.slippage_bps = float(sb)
-                    settings.risk.min_profit_usd = float(mp)
-                    res = detect_arbs(kalshi, poly)
-                    if not res:
-                        res = detect_arbs_with_matcher(
-                            kalshi,
-                            poly,
-                            similarity_threshold=chosen_thresh,
-                            explicit_map=explicit_map_for_detection,
-                        )
-                    return res
-                finally:
-                    settings.fees.taker_bps, settings.risk.slippage_bps, settings.risk.min_profit_usd = tb0, sb0, mp0
-            for tb in fee_grid:
-                for sb in slip_grid:
-                    for mp in profit_grid:
-                        cand = _run_with(tb, sb, mp)
-                        if cand:
-                            m = max(cand, key=lambda a: (a.gross_profit_usd, a.edge_bps))
-                            if m.gross_profit_usd > best_profit:
-                                best_profit = m.gross_profit_usd
-                                best_combo = (tb, sb, mp)
-                                best_cross = cand
+            best_pick = None
+            for tb, sb, mp in combos:
+                # Exact-title arbs win; fuzzy matches are the fallback when none survive
+                for raw, gross_bps, notional in raw_sets:
+                    net_bps = gross_bps - (tb + sb)
+                    profit = net_bps / 10000.0 * notional
+                    keep = (net_bps > 0) & (profit >= mp)
+                    if keep.any():
+                        break
+                else:
+                    continue
+                top = float(profit[keep].max())
+                if top > best_profit:
+                    best_profit = top
+                    best_combo = (tb, sb, mp)
+                    best_pick = (raw, net_bps, profit, keep)
             if best_combo is not None:
                 chosen_fees = best_combo
-                cross = best_cross
+                raw, net_bps, profit, keep = best_pick
+                cross = [
+                    replace(a, edge_bps=e, gross_profit_usd=g)
+                    for a, e, g, k in zip(raw, net_bps.tolist(), profit.tolist(), keep.tolist())
+                    if k
+                ]
         st.session_state.timing_tracker.stop("detect_arbs")
         if progress_bar is not None:
             progress_bar.progress(65)
         # Optional LLM validation to filter implausible pairs by title logic
         if use_llm_validation and cross:
             st.session_state.timing_tracker.start("llm_validation")
-            pairs = []
-            for c in cross:
-                # Titles stored in long/short MarketQuote
-                pairs.append((c.long.event, c.short.event))
+            # Titles stored in long/short MarketQuote; arbs on both outcome
+            # combinations of one event pair share a single verdict
+            pairs = list(dict.fromkeys((c.long.event, c.short.event) for c in cross))
             try:
-                verdicts = validate_pairs_openai(pairs, model=llm_model)
-                cross = [c for c in cross if verdicts.get((c.long.event, c.short.event), {}).get("same_event") and verdicts.get((c.long.event, c.short.event), {}).get("direction_consistent", True)]
+                from app.utils.llm_validate import validate_pairs_openai_async
+
+                verdicts = _loop().run_until_complete(validate_pairs_openai_async(pairs, model=llm_model))
+
+                def _keep(c: CrossExchangeArb) -> bool:
+                    v = verdicts.get((c.long.event, c.short.event))
+                    return bool(v) and bool(v.get("same_event")) and bool(v.get("direction_consistent", True))
+
+                cross = [c for c in cross if _keep(c)]
             except Exception as e:  # noqa: BLE001
                 st.warning(f"LLM validation failed: {e}")
             finally:
@@ -597,14 +842,21 @@ with tab1:
         if cap:
             st.caption("Auto settings → " + ", ".join(cap))
         render_best_cross_summary(cross)
-        render_cross_arbs(cross, budget=budget)
+        render_cross_arbs_with_budget(cross)
     else:
         st.info("Matching not run yet. Click 'Run matching now' or enable auto-run.")
 with tab2:
     if auto_run_match or run_match:
         st.session_state.timing_tracker.start("detect_two_buy")
         with st.spinner("Running two-buy detection..."):
-            two = detect_two_buy_arbs(kalshi, poly)
+            two = _two_buy_cached(
+                tuple(kalshi),
+                tuple(poly),
+                settings.fees.taker_bps,
+                settings.risk.slippage_bps,
+                settings.risk.max_notional_per_leg,
+                settings.risk.min_profit_usd,
+            )
         st.session_state.timing_tracker.stop("detect_two_buy")
         if progress_bar is not None:
             progress_bar.progress(85)
@@ -620,7 +872,7 @@ if data_mode == "Demo data" and mode == "Run demo pipeline":
             from app.main import run_once
             return await run_once()
 
-        result = asyncio.run(_run())
+        result = _loop().run_until_complete(_run())
         st.success(f"Demo executed. Opportunities handled: {result}")
 elif data_mode == "Live data (read-only)" and mode == "Run live-skeleton":
     if st.button("Execute live-skeleton now"):
@@ -628,7 +880,7 @@ elif data_mode == "Live data (read-only)" and mode == "Run live-skeleton":
             from app.main import run_live_once
             return await run_live_once()
 
-        result = asyncio.run(_run())
+        result = _loop().run_until_complete(_run())
         st.success(f"Live-skeleton executed. Opportunities handled: {result}")
 
 # Timing Performance Summary
@@ -647,13 +899,13 @@ else:
 st.markdown("---")
 st.markdown("#### Diagnostics")
 def _sample(events, n=5):
-    seen = []
+    # Dict keys keep first-seen order with O(1) membership checks
+    seen = {}
     for e in events:
-        if e not in seen:
-            seen.append(e)
+        seen[e] = None
         if len(seen) >= n:
             break
-    return seen
+    return list(seen)
 
 kalshi_events = [q.event for q in kalshi]
 poly_events = [q.event for q in poly]
@@ -678,15 +930,19 @@ if auto_run_match or run_match:
         # If external embeddings enabled, use embedding-based matcher for better recall
         if use_openai:
             if progress_bar is None:
-                progress_bar = progress_container.progress(5)
+                progress_bar = _DebouncedProgress(progress_container.progress(5))
             with st.spinner("Building embedding candidates (OpenAI cache)…"):
                 async def _run():
+                    from app.core.embedding_matcher import build_embedding_candidates_async
+
                     start_ts = time.time()
                     eta_text = st.empty()
                     def _progress(frac: float):
                         try:
-                            if progress_bar is not None:
-                                progress_bar.progress(min(98, max(70, int(70 + 25 * frac))))
+                            # The ETA caption is another websocket message, so
+                            # it is refreshed only when the bar was
+                            if not progress_bar.update(min(98, max(70, int(70 + 25 * frac)))):
+                                return
                             # ETA estimation
                             elapsed = max(0.0, time.time() - start_ts)
                             if frac > 1e-3:
@@ -703,66 +959,29 @@ if auto_run_match or run_match:
                         pass
                     return result
                 try:
-                    cands = asyncio.run(_run())
+                    cands = [(c.event_key, c.similarity) for c in _loop().run_until_complete(_run())]
                 except Exception as e:  # noqa: BLE001
                     st.warning(f"Embedding-based matching failed: {e}")
                     cands = []
         else:
-            matcher = EventMatcher(explicit_map=explicit_map_for_detection, threshold=th_display)
-            # Build lightweight quotes for candidate generation (chunked)
-            def _progress(frac: float):
-                try:
-                    if progress_bar is not None:
-                        progress_bar.progress(min(98, max(70, int(70 + 25 * frac))))
-                except Exception:
-                    pass
-            cands = matcher.build_candidates(
-                [MQ("kalshi", "", q.event, "YES", 0.0, 0.0) for q in kalshi],
-                [MQ("polymarket", "", q.event, "YES", 0.0, 0.0) for q in poly],
-                limit_sources=None,
+            cands = _cached_candidates(
+                _event_tuple(kalshi),
+                _event_tuple(poly),
+                tuple(explicit_map_for_detection.items()),
+                float(th_display),
                 max_targets_per_source=50,
-                progress_cb=_progress,
-            )
-        # Build price lookup by event/outcome for quick edge preview
-        from collections import defaultdict
-        def _by_event(quotes: List[MQ]):
-            d = defaultdict(dict)
-            for q in quotes:
-                d[q.event][q.outcome] = q
-            return d
-        k_by = _by_event(kalshi)
-        p_by = _by_event(poly)
-
-        # Compute simple edge preview for each candidate if outcomes available
-        rows = []
-        total_bps = settings.fees.taker_bps + settings.risk.slippage_bps
-        for c in sorted(cands, key=lambda x: x.similarity, reverse=True)[:20]:
-            try:
-                ek, ep = c.event_key.split(" <-> ", 1)
-            except ValueError:
-                ek, ep = c.event_key, ""
-            kq = k_by.get(ek, {})
-            pq = p_by.get(ep, {})
-            edge_a = None
-            edge_b = None
-            if "YES" in kq and "NO" in pq:
-                edge_a = compute_edge_bps(kq["YES"].price, pq["NO"].price) - total_bps
-            if "YES" in pq and "NO" in kq:
-                edge_b = compute_edge_bps(pq["YES"].price, kq["NO"].price) - total_bps
-            rows.append(
-                {
-                    "pair": c.event_key,
-                    "similarity": round(float(c.similarity), 3),
-                    "K YES": round(kq.get("YES").price, 3) if "YES" in kq else None,
-                    "P NO": round(pq.get("NO").price, 3) if "NO" in pq else None,
-                    "edge_bps K_yes+P_no": round(edge_a, 1) if edge_a is not None else None,
-                    "P YES": round(pq.get("YES").price, 3) if "YES" in pq else None,
-                    "K NO": round(kq.get("NO").price, 3) if "NO" in kq else None,
-                    "edge_bps P_yes+K_no": round(edge_b, 1) if edge_b is not None else None,
-                }
             )
+        # Edge preview for the top candidates, computed for all rows at once
+        # Partial selection: only the 20 best are shown, so skip the full sort
+        top = heapq.nlargest(20, cands, key=lambda x: x[1])
+        pairs = []
+        for event_key, sim in top:
+            # ep is "" when the key has no separator
+            ek, _, ep = event_key.partition(" <-> ")
+            pairs.append((event_key, ek, ep, sim))
+        rows = _pair_price_rows(pairs, kalshi, poly)
         if rows:
-            st.dataframe(rows, width='stretch', hide_index=True)
+            st.dataframe(rows, width='stretch', hide_index=True, column_order=_DIAG_COLUMNS)
         else:
             st.info("No candidate pairs found at current threshold. Try lowering the threshold or enabling ML embeddings.")
         if progress_bar is not None:
@@ -781,9 +1000,8 @@ if auto_map:
     try:
         # Normalize to original casing where possible
         orig_map = {}
-        k_index = {q.event.lower().strip(): q.event for q in kalshi}
         for k_lc, v in auto_map.items():
-            orig_map[k_index.get(k_lc, k_lc)] = v
+            orig_map[k_titles_by_key.get(k_lc, k_lc)] = v
         data = json.dumps(orig_map, indent=2)
         st.download_button("Download auto alias JSON", data=data, file_name="alias_map.auto.json", mime="application/json")
     except Exception:
@@ -4,10 +4,24 @@ This module provides functions to filter market quotes by their resolution dates
 """
 
 from datetime import datetime, timedelta, timezone
+from itertools import compress
 from typing import List, Optional
 
+import numpy as np
+
 from app.core.models import MarketQuote
 
+_SECONDS_PER_DAY = 86400.0
+
+
+def _end_timestamps(quotes: List[MarketQuote]) -> np.ndarray:
+    """POSIX timestamps of each quote's end_date, NaN where there is none."""
+    return np.fromiter(
+        (q.end_date.timestamp() if q.end_date is not None else np.nan for q in quotes),
+        dtype=np.float64,
+        count=len(quotes),
+    )
+
 
 def filter_by_days_until_resolution(
     quotes: List[MarketQuote],
@@ -34,25 +48,17 @@ def filter_by_days_until_resolution(
     if not quotes:
         return quotes
     
-    now = datetime.now(timezone.utc)
-    filtered = []
-    
-    for quote in quotes:
-        if quote.end_date is None:
-            # If no date, include it (or skip based on your preference)
-            continue
-        
-        days_until = (quote.end_date - now).days
-        
-        # Check bounds
-        if min_days is not None and days_until < min_days:
-            continue
-        if max_days is not None and days_until > max_days:
-            continue
-        
-        filtered.append(quote)
-    
-    return filtered
+    # Whole days until resolution, floored like timedelta.days; quotes
+    # without a date compare False against every bound and are dropped
+    now = datetime.now(timezone.utc).timestamp()
+    ts = _end_timestamps(quotes)
+    days_until = np.floor((ts - now) / _SECONDS_PER_DAY)
+    mask = ~np.isnan(ts)
+    if min_days is not None:
+        mask &= days_until >= min_days
+    if max_days is not None:
+        mask &= days_until <= max_days
+    return list(compress(quotes, mask.tolist()))
 
 
 def filter_by_date_range(
@@ -73,20 +79,13 @@ def filter_by_date_range(
     if not quotes:
         return quotes
     
-    filtered = []
-    
-    for quote in quotes:
-        if quote.end_date is None:
-            continue
-        
-        if start_date and quote.end_date < start_date:
-            continue
-        if end_date and quote.end_date > end_date:
-            continue
-        
-        filtered.append(quote)
-    
-    return filtered
+    ts = _end_timestamps(quotes)
+    mask = ~np.isnan(ts)
+    if start_date:
+        mask &= ts >= start_date.timestamp()
+    if end_date:
+        mask &= ts <= end_date.timestamp()
+    return list(compress(quotes, mask.tolist()))
 
 
 def get_days_until_resolution(quote: MarketQuote) -> Optional[int]:
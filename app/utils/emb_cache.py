@@ -1,15 +1,16 @@
 import os
 import hashlib
 import json
+import pickle
 from pathlib import Path
 from typing import List, Dict, Callable, Tuple, Optional
 
 import numpy as np
 
 try:
-    from openai import OpenAI  # type: ignore
+    from openai import AsyncOpenAI  # type: ignore
 except Exception:  # pragma: no cover
-    OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
 
 
 CACHE_DIR = Path(os.getenv("EMB_CACHE_DIR", ".cache/openai"))
@@ -17,69 +18,190 @@ CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 
 def _hash(text: str) -> str:
-    h = hashlib.sha256()
-    h.update(text.strip().lower().encode())
-    return h.hexdigest()
+    # SHA-256 keeps existing cache keys valid; for short titles the call
+    # overhead dominates, so BLAKE2 or xxhash would not be measurably faster
+    return hashlib.sha256(text.strip().lower().encode()).hexdigest()
 
 
 def _cache_path(h: str) -> Path:
+    """Per-text JSON file used by older versions; only read to migrate entries."""
     return CACHE_DIR / f"{h}.json"
 
 
+class EmbCache:
+    """Append-only float16 embedding matrix with a text-hash -> row index.
+
+    Rows live in one raw file read through `np.memmap`, so a lookup is an index
+    into mapped memory instead of one file open and parse per text. The index
+    sidecar is replaced atomically after rows are appended, so it never points
+    past the end of the matrix.
+    """
+
+    def __init__(self, directory: Path):
+        self.vec_path = directory / "vecs.f16"
+        self.idx_path = directory / "index.pkl"
+        self.dim = 0
+        self.idx: Dict[str, int] = {}
+        try:
+            with self.idx_path.open("rb") as f:
+                meta = pickle.load(f)
+            self.dim = int(meta["dim"])
+            self.idx = dict(meta["rows"])
+        except Exception:
+            self.dim, self.idx = 0, {}
+        self.mat: Optional[np.memmap] = None
+        self._remap()
+
+    def _remap(self) -> None:
+        rows = len(self.idx)
+        if not rows or not self.dim or not self.vec_path.exists():
+            self.mat = None
+            return
+        try:
+            self.mat = np.memmap(self.vec_path, dtype=np.float16, mode="r", shape=(rows, self.dim))
+        except ValueError:
+            # Matrix shorter than the index says: start over rather than misread rows
+            self.mat, self.dim, self.idx = None, 0, {}
+
+    def get(self, hashes: List[str]) -> Tuple[List[int], np.ndarray]:
+        """Return positions in `hashes` that are cached and their float32 rows."""
+        found = [(i, self.idx[h]) for i, h in enumerate(hashes) if h in self.idx]
+        if not found or self.mat is None:
+            return [], np.zeros((0, self.dim), dtype=np.float32)
+        pos, rows = zip(*found)
+        return list(pos), self.mat[np.fromiter(rows, dtype=np.int64, count=len(rows))].astype(np.float32)
+
+    def add(self, vectors: Dict[str, np.ndarray]) -> None:
+        """Append vectors keyed by text hash, skipping known hashes and other dims."""
+        new = {h: v for h, v in vectors.items() if h not in self.idx}
+        if not new:
+            return
+        if not self.dim:
+            self.dim = len(next(iter(new.values())))
+        new = {h: v for h, v in new.items() if len(v) == self.dim}
+        if not new:
+            return
+        block = np.stack([np.asarray(v, dtype=np.float16) for v in new.values()])
+        start = len(self.idx)
+        self.mat = None
+        with self.vec_path.open("r+b" if self.vec_path.exists() else "wb") as f:
+            # Drop rows from an append whose index update never landed
+            f.truncate(start * self.dim * block.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(block.tobytes())
+        for i, h in enumerate(new):
+            self.idx[h] = start + i
+        tmp_path = self.idx_path.with_suffix(".tmp")
+        with tmp_path.open("wb") as f:
+            pickle.dump({"dim": self.dim, "rows": self.idx}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(self.idx_path)
+        self._remap()
+
+
+_CACHE: Optional[EmbCache] = None
+
+
+def _get_cache() -> EmbCache:
+    global _CACHE
+    if _CACHE is None:
+        _CACHE = EmbCache(CACHE_DIR)
+    return _CACHE
+
+
+def _load_legacy(h: str) -> Optional[np.ndarray]:
+    p = _cache_path(h)
+    if not p.exists():
+        return None
+    with p.open("r") as f:
+        return np.array(json.load(f)["embedding"], dtype=np.float32)
+
+
 def load_cached(texts: List[str]) -> Tuple[Dict[str, np.ndarray], List[str]]:
-    """Return (cached_vectors, missing_texts)."""
-    cached: Dict[str, np.ndarray] = {}
-    missing: List[str] = []
-    for t in texts:
-        p = _cache_path(_hash(t))
-        if p.exists():
-            try:
-                with p.open("r") as f:
-                    data = json.load(f)
-                vec = np.array(data["embedding"], dtype=np.float32)
-                cached[t] = vec
-            except Exception:
-                missing.append(t)
-        else:
-            missing.append(t)
+    """Return (cached_vectors, missing_texts).
+
+    Vectors come back as float32. Entries still in the per-text files written
+    by older versions are read once and moved into the shared matrix.
+    """
+    cached, missing, _ = _load_cached_hashed(texts)
     return cached, missing
 
 
-def save_cached(pairs: Dict[str, np.ndarray]):
-    for t, vec in pairs.items():
-        p = _cache_path(_hash(t))
+def _load_cached_hashed(texts: List[str]) -> Tuple[Dict[str, np.ndarray], List[str], Dict[str, str]]:
+    """`load_cached` plus text -> hash for the missing texts, so callers can
+    store fetched vectors without hashing each title a second time."""
+    cache = _get_cache()
+    hashes = [_hash(t) for t in texts]
+    pos, rows = cache.get(hashes)
+    cached: Dict[str, np.ndarray] = {texts[i]: row for i, row in zip(pos, rows)}
+    missing: Dict[str, str] = {}
+    migrated: Dict[str, np.ndarray] = {}
+    for t, h in zip(texts, hashes):
+        if t in cached or t in missing:
+            continue
         try:
-            with p.open("w") as f:
-                json.dump({"embedding": vec.tolist()}, f)
+            vec = _load_legacy(h)
         except Exception:
-            # best-effort cache
-            pass
+            vec = None
+        if vec is None:
+            missing[t] = h
+        else:
+            cached[t] = vec
+            migrated[h] = vec
+    if migrated:
+        _save_hashed(migrated)
+    return cached, list(missing), missing
+
+
+def _save_hashed(vectors: Dict[str, np.ndarray]) -> None:
+    try:
+        _get_cache().add(vectors)
+    except Exception:
+        # best-effort cache
+        pass
+
+
+def save_cached(pairs: Dict[str, np.ndarray]):
+    _save_hashed({_hash(t): vec for t, vec in pairs.items()})
 
 
 async def embed_texts_openai_cached(
     texts: List[str],
     model: str = "text-embedding-3-small",
     progress_cb: Optional[Callable[[float], None]] = None,
+    max_concurrency: int = 8,
 ) -> Dict[str, np.ndarray]:
-    """Embed texts via OpenAI with on-disk cache."""
+    """Embed texts via OpenAI with on-disk cache.
+
+    Missing texts go out in batches, up to `max_concurrency` requests at once.
+    """
     import asyncio
-    if OpenAI is None:
+    if AsyncOpenAI is None:
         raise RuntimeError("openai package not installed; run pip install openai")
 
-    cached, missing = load_cached(texts)
+    cached, missing, hash_of = _load_cached_hashed(texts)
     out: Dict[str, np.ndarray] = dict(cached)
     if not missing:
         return out
 
     CHUNK = 96  # stay below 100/request
-    client = OpenAI()
-    for i in range(0, len(missing), CHUNK):
-        batch = missing[i : i + CHUNK]
-        resp = client.embeddings.create(model=model, input=batch)
+    client = AsyncOpenAI()
+    sem = asyncio.Semaphore(max(1, max_concurrency))
+    done = 0
+
+    async def _embed(batch: List[str]) -> None:
+        nonlocal done
+        async with sem:
+            resp = await client.embeddings.create(model=model, input=batch)
         for inp, emb in zip(batch, resp.data):
             vec = np.asarray(emb.embedding, dtype=np.float32)
             out[inp] = vec
-        save_cached({inp: out[inp] for inp in batch})
+        _save_hashed({hash_of[inp]: out[inp] for inp in batch})
+        done += len(batch)
         if progress_cb:
-            progress_cb(min(1.0, (i + CHUNK) / len(missing)))
+            progress_cb(min(1.0, done / len(missing)))
+
+    try:
+        await asyncio.gather(*(_embed(missing[i : i + CHUNK]) for i in range(0, len(missing), CHUNK)))
+    finally:
+        await client.close()
     return out
@@ -2,27 +2,44 @@ from __future__ import annotations
 
 from typing import Dict, Iterable, List, Optional, Tuple, Callable
 
-import math
 import os
 import json
 from pathlib import Path
 
-from app.utils.text import extract_numbers_window
+import numpy as np
 
+try:
+    import simsimd
+except Exception:  # pragma: no cover - optional dependency
+    simsimd = None
 
-def _cosine(a: List[float], b: List[float]) -> float:
-    if not a or not b or len(a) != len(b):
-        return 0.0
-    num = 0.0
-    da = 0.0
-    db = 0.0
-    for x, y in zip(a, b):
-        num += x * y
-        da += x * x
-        db += y * y
-    if da == 0.0 or db == 0.0:
-        return 0.0
-    return num / (da ** 0.5 * db ** 0.5)
+from app.utils.text import number_window_ids
+
+# Source rows scored per matrix product; bounds the (block, n_targets) buffers
+_SIM_BLOCK = 1024
+
+
+def _unit_rows(mat: np.ndarray) -> np.ndarray:
+    """L2-normalize each row; all-zero rows (missing embeddings) stay zero."""
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    return np.divide(mat, norms, out=np.zeros_like(mat), where=norms > 0)
+
+
+def _cosine_matrix(src: np.ndarray, tgt: np.ndarray, normalized: bool = False) -> np.ndarray:
+    """Cosine similarity of every (src row, tgt row) pair; zero rows score 0.
+
+    Uses SimSIMD's multithreaded `cdist` kernels when installed, otherwise one
+    BLAS matrix product of L2-normalized rows. Pass `normalized=True` when
+    rows already have unit length to skip renormalizing them.
+    """
+    if simsimd is not None and src.size and tgt.size:
+        sims = 1.0 - np.asarray(simsimd.cdist(src, tgt, metric="cosine", threads=0), dtype=np.float32)
+        sims[~src.any(axis=1)] = 0.0
+        sims[:, ~tgt.any(axis=1)] = 0.0
+        return sims
+    if normalized:
+        return src @ tgt.T
+    return _unit_rows(src) @ _unit_rows(tgt).T
 
 
 def _chunk(seq: List[str], n: int) -> List[List[str]]:
@@ -32,90 +49,157 @@ def _chunk(seq: List[str], n: int) -> List[List[str]]:
 def _cache_paths(model: str) -> Tuple[Path, Path]:
     base = Path(os.getenv("EMBED_CACHE_DIR") or Path.home() / ".cache" / "polykalshi")
     base.mkdir(parents=True, exist_ok=True)
-    return base, base / f"embeddings_{model.replace('/', '_')}.json"
+    return base, base / f"embeddings_{model.replace('/', '_')}.npz"
 
 
-def embed_openai(
+def _text_key(text: str) -> str:
+    """Cache and dedupe key: case and surrounding whitespace do not change a title."""
+    return text.strip().lower()
+
+
+# Per-process view of the on-disk cache: cache file -> text -> float16 vector.
+# Loaded once so repeated dashboard runs skip both the file read and the API
+# round-trips. Half precision halves memory and disk size; cosine scores move
+# by well under the matching thresholds' resolution.
+_MEMORY_CACHE: Dict[Path, Dict[str, np.ndarray]] = {}
+
+
+def _load_cache(model: str) -> Dict[str, np.ndarray]:
+    _, cache_file = _cache_paths(model)
+    data = _MEMORY_CACHE.get(cache_file)
+    if data is None:
+        data = {}
+        legacy_file = cache_file.with_suffix(".json")
+        try:
+            if cache_file.exists():
+                with np.load(cache_file, allow_pickle=False) as npz:
+                    data = dict(zip(map(_text_key, npz["texts"].tolist()), npz["vecs"]))
+            elif legacy_file.exists():
+                # One-shot migration from the JSON cache written by older versions
+                raw = json.loads(legacy_file.read_text())
+                data = {_text_key(t): np.asarray(v, dtype=np.float16) for t, v in raw.items()}
+        except Exception:
+            data = {}
+        _MEMORY_CACHE[cache_file] = data
+    return data
+
+
+def _save_cache(model: str, data: Dict[str, np.ndarray]) -> None:
+    """Write the cache as one float16 matrix plus its row texts, atomically."""
+    _, cache_file = _cache_paths(model)
+    texts = list(data)
+    tmp_file = cache_file.with_suffix(".npz.tmp")
+    with tmp_file.open("wb") as f:
+        np.savez(f, texts=np.array(texts, dtype=str), vecs=np.stack([data[t] for t in texts]))
+    tmp_file.replace(cache_file)
+
+
+async def embed_openai_async(
     texts: List[str],
     model: str = "text-embedding-3-small",
     api_key: Optional[str] = None,
     base_url: Optional[str] = None,
-    batch_size: int = 128,
+    batch_size: int = 256,
     use_cache: bool = True,
     progress_cb: Optional[Callable[[float], None]] = None,
-) -> List[List[float]]:
+    max_concurrency: int = 8,
+) -> np.ndarray:
     """Return embeddings for texts using OpenAI Embeddings API.
 
-    Reads API key from OPENAI_API_KEY if not provided. Optional base_url allows
-    using compatible providers.
+    The result is a float32 array of shape (len(texts), dim); rows for texts
+    without an embedding are zero. Uncached texts are sent in batches of
+    `batch_size`, with up to `max_concurrency` requests in flight. Reads API
+    key from OPENAI_API_KEY if not provided. Optional base_url allows using
+    compatible providers.
     """
-    try:
-        from openai import OpenAI
-    except Exception as exc:  # pragma: no cover - optional dependency not installed
-        raise RuntimeError("openai package not installed; run pip install openai") from exc
-
-    key = api_key or os.getenv("OPENAI_API_KEY")
-    if not key:
-        raise RuntimeError("OPENAI_API_KEY is not set")
-
-    client = OpenAI(api_key=key, base_url=base_url or os.getenv("OPENAI_BASE_URL") or None)
+    import asyncio
 
     # Load cache
-    cache_data: Dict[str, List[float]] = {}
-    seen: Dict[str, List[float]] = {}
-    if use_cache:
-        _, cache_file = _cache_paths(model)
-        if cache_file.exists():
-            try:
-                cache_data = json.loads(cache_file.read_text())
-            except Exception:
-                cache_data = {}
-
-    # Prepare batches with cache hits/misses
-    misses: List[str] = []
-    hits = 0
-    for t in texts:
-        key_t = t.strip()
-        if use_cache and key_t in cache_data:
-            seen[key_t] = cache_data[key_t]
-            hits += 1
-        else:
-            misses.append(key_t)
+    cache_data: Dict[str, np.ndarray] = _load_cache(model) if use_cache else {}
+
+    # Prepare batches with cache hits/misses. Titles differing only in case or
+    # surrounding whitespace share one key, so each is embedded once.
+    keys = [_text_key(t) for t in texts]
+    misses: Dict[str, str] = {}  # key -> first surface form, sent to the API
+    for t, key_t in zip(texts, keys):
+        if key_t not in cache_data:
+            misses.setdefault(key_t, t.strip())
+    hits = len(texts) - sum(1 for key_t in keys if key_t in misses)
     if progress_cb is not None and len(texts) > 0:
         progress_cb(min(1.0, hits / float(len(texts))))
 
-    # Embed misses
-    miss_vectors: Dict[str, List[float]] = {}
-    for chunk in _chunk(misses, max(1, batch_size)):
-        if not chunk:
-            continue
-        resp = client.embeddings.create(model=model, input=chunk)
-        for i, item in enumerate(resp.data):
-            miss_vectors[chunk[i]] = list(item.embedding)
-        if progress_cb is not None and len(texts) > 0:
-            done = min(len(texts), hits + len(miss_vectors))
-            progress_cb(min(1.0, done / float(len(texts))))
-
-    # Merge into cache and persist
-    if use_cache:
+    # Embed misses; the openai import and client are only paid for when
+    # something is not cached, so all-hit runs never touch the SDK
+    miss_vectors: Dict[str, np.ndarray] = {}
+    if misses:
+        try:
+            from openai import AsyncOpenAI
+        except Exception as exc:  # pragma: no cover - optional dependency not installed
+            raise RuntimeError("openai package not installed; run pip install openai") from exc
+
+        key = api_key or os.getenv("OPENAI_API_KEY")
+        if not key:
+            raise RuntimeError("OPENAI_API_KEY is not set")
+        client = AsyncOpenAI(api_key=key, base_url=base_url or os.getenv("OPENAI_BASE_URL") or None)
+        sem = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _embed(chunk: List[str]) -> None:
+            async with sem:
+                resp = await client.embeddings.create(model=model, input=[misses[k] for k in chunk])
+            for i, item in enumerate(resp.data):
+                miss_vectors[chunk[i]] = np.asarray(item.embedding, dtype=np.float16)
+            if progress_cb is not None and len(texts) > 0:
+                done = min(len(texts), hits + len(miss_vectors))
+                progress_cb(min(1.0, done / float(len(texts))))
+
+        try:
+            await asyncio.gather(*(_embed(chunk) for chunk in _chunk(list(misses), max(1, batch_size))))
+        finally:
+            await client.close()
+
+    # Merge into cache and persist only when something new was fetched
+    if use_cache and miss_vectors:
         cache_data.update(miss_vectors)
         try:
-            _, cache_file = _cache_paths(model)
-            cache_file.write_text(json.dumps(cache_data))
+            _save_cache(model, cache_data)
         except Exception:
             pass
 
-    # Return in original order
-    vectors: List[List[float]] = []
-    for t in texts:
-        key_t = t.strip()
-        vec = seen.get(key_t) or miss_vectors.get(key_t)
-        if vec is None:
-            vec = []
-        vectors.append(vec)
+    # Return in original order as one float32 matrix
+    ordered = [cache_data.get(key_t) if key_t in cache_data else miss_vectors.get(key_t) for key_t in keys]
+    dim = max((v.size for v in ordered if v is not None), default=0)
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for i, vec in enumerate(ordered):
+        if vec is not None and vec.size == dim:
+            vectors[i] = vec
     return vectors
 
 
+def embed_openai(
+    texts: List[str],
+    model: str = "text-embedding-3-small",
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    batch_size: int = 256,
+    use_cache: bool = True,
+    progress_cb: Optional[Callable[[float], None]] = None,
+) -> np.ndarray:
+    """Blocking wrapper around `embed_openai_async`."""
+    import asyncio
+
+    return asyncio.run(
+        embed_openai_async(
+            texts,
+            model=model,
+            api_key=api_key,
+            base_url=base_url,
+            batch_size=batch_size,
+            use_cache=use_cache,
+            progress_cb=progress_cb,
+        )
+    )
+
+
 def build_embedding_map_openai(
     sources: Iterable[str],
     targets: Iterable[str],
@@ -124,7 +208,7 @@ def build_embedding_map_openai(
     model: str = "text-embedding-3-small",
     api_key: Optional[str] = None,
     base_url: Optional[str] = None,
-    batch_size: int = 128,
+    batch_size: int = 256,
     use_cache: bool = True,
     progress_cb: Optional[Callable[[float], None]] = None,
 ) -> Dict[str, Tuple[str, float]]:
@@ -137,47 +221,48 @@ def build_embedding_map_openai(
     if not src_list or not tgt_list:
         return {}
 
-    def _p1(f: float):
-        if progress_cb is not None:
-            progress_cb(0.5 * max(0.0, min(1.0, f)))
-    src_emb = embed_openai(
-        src_list,
-        model=model,
-        api_key=api_key,
-        base_url=base_url,
-        batch_size=batch_size,
-        use_cache=use_cache,
-        progress_cb=_p1,
-    )
-    def _p2(f: float):
-        if progress_cb is not None:
-            progress_cb(0.5 + 0.5 * max(0.0, min(1.0, f)))
-    tgt_emb = embed_openai(
-        tgt_list,
+    # Titles worded identically on both sides score 1.0 without embedding;
+    # only the remaining sources go through the API and the cosine scan
+    mapping: Dict[str, Tuple[str, float]] = {}
+    if min_similarity <= 1.0:
+        tgt_by_key: Dict[str, str] = {}
+        for t in tgt_list:
+            tgt_by_key.setdefault(_text_key(t), t)
+        for s in src_list:
+            t = tgt_by_key.get(_text_key(s))
+            if t is not None:
+                mapping[s] = (t, 1.0)
+        src_list = [s for s in src_list if s not in mapping]
+        if not src_list:
+            return mapping
+
+    # One call for both sides: a single cache lookup and shared API batches
+    all_emb = embed_openai(
+        src_list + tgt_list,
         model=model,
         api_key=api_key,
         base_url=base_url,
         batch_size=batch_size,
         use_cache=use_cache,
-        progress_cb=_p2,
+        progress_cb=progress_cb,
     )
+    # Exact scan in row blocks, so the score and guard matrices stay at
+    # (_SIM_BLOCK, n_targets) instead of growing with n_sources * n_targets
+    src = _unit_rows(all_emb[: len(src_list)])
+    tgt = _unit_rows(all_emb[len(src_list) :])
+    if strict_numbers:
+        s_ids, t_ids = number_window_ids(src_list, tgt_list)
+    best_j = np.zeros(len(src_list), dtype=np.int64)
+    best = np.zeros(len(src_list), dtype=np.float32)
+    for start in range(0, len(src_list), _SIM_BLOCK):
+        stop = start + _SIM_BLOCK
+        sims = _cosine_matrix(src[start:stop], tgt, normalized=True)
+        if strict_numbers:
+            ids = s_ids[start:stop, None]
+            sims[(ids >= 0) & (t_ids >= 0) & (ids != t_ids)] = -np.inf
+        best_j[start:stop] = sims.argmax(axis=1)
+        best[start:stop] = sims[np.arange(sims.shape[0]), best_j[start:stop]]
 
-    mapping: Dict[str, Tuple[str, float]] = {}
-    for i, s_orig in enumerate(src_list):
-        best_j = -1
-        best = -math.inf
-        nums_s = extract_numbers_window(s_orig) if strict_numbers else ()
-        for j, t_orig in enumerate(tgt_list):
-            if strict_numbers:
-                nums_t = extract_numbers_window(t_orig)
-                if nums_s and nums_t and nums_s != nums_t:
-                    continue
-            score = _cosine(src_emb[i], tgt_emb[j])
-            if score > best:
-                best = score
-                best_j = j
-        if best_j >= 0 and best >= min_similarity:
-            mapping[s_orig] = (tgt_list[best_j], float(best))
+    for i in np.flatnonzero(best >= min_similarity).tolist():
+        mapping[src_list[i]] = (tgt_list[int(best_j[i])], float(best[i]))
     return mapping
-
-
@@ -3,7 +3,14 @@
 This module provides URL generators for Polymarket and Kalshi market pages.
 """
 
+import re
+from functools import lru_cache
 
+# Long hex token IDs (more than 10 characters) link to the event page
+_HEX_TOKEN_RE = re.compile(r"[0-9a-fA-F]{11,}")
+
+
+@lru_cache(maxsize=4096)
 def polymarket_market_url(market_id: str) -> str:
     """Generate Polymarket market URL.
     
@@ -18,13 +25,14 @@ def polymarket_market_url(market_id: str) -> str:
     # Or: https://polymarket.com/market/[slug]
     
     # If it's a full token ID (long hex string), use token format
-    if len(market_id) > 10 and all(c in '0123456789abcdefABCDEF' for c in market_id):
+    if _HEX_TOKEN_RE.fullmatch(market_id):
         return f"https://polymarket.com/event/{market_id}"
     
     # Otherwise, try market format
     return f"https://polymarket.com/market/{market_id}"
 
 
+@lru_cache(maxsize=4096)
 def kalshi_market_url(market_id: str) -> str:
     """Generate Kalshi market URL.
     
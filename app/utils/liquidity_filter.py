@@ -4,10 +4,38 @@ This module provides functions to filter out markets with insufficient liquidity
 or incomplete order books (e.g., only YES orders, only NO orders, or no orders).
 """
 
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional
 
 from app.core.models import MarketQuote
 
+# event -> outcome -> quotes for that outcome
+_EventIndex = Dict[str, Dict[str, List[MarketQuote]]]
+
+
+def _index_by_event(quotes: List[MarketQuote]) -> _EventIndex:
+    """Group quotes by event and outcome in a single pass."""
+    index: _EventIndex = defaultdict(lambda: defaultdict(list))
+    for q in quotes:
+        index[q.event][q.outcome].append(q)
+    return index
+
+
+def _group_has_both_outcomes(group: Dict[str, List[MarketQuote]]) -> bool:
+    return bool(group.get("YES")) and bool(group.get("NO"))
+
+
+def _group_has_valid_prices(group: Dict[str, List[MarketQuote]]) -> bool:
+    yes_quotes = group.get("YES") or []
+    no_quotes = group.get("NO") or []
+    return any(q.price > 0 for q in yes_quotes) and any(q.price > 0 for q in no_quotes)
+
+
+def _group_has_minimum_liquidity(group: Dict[str, List[MarketQuote]], min_size: float) -> bool:
+    yes_quotes = group.get("YES") or []
+    no_quotes = group.get("NO") or []
+    return any(q.size >= min_size for q in yes_quotes) and any(q.size >= min_size for q in no_quotes)
+
 
 def has_both_outcomes(quotes: List[MarketQuote], event: str) -> bool:
     """Check if an event has both YES and NO quotes.
@@ -19,12 +47,7 @@ def has_both_outcomes(quotes: List[MarketQuote], event: str) -> bool:
     Returns:
         True if both YES and NO quotes exist for the event
     """
-    events = {q.event for q in quotes if q.event == event}
-    if not events:
-        return False
-    
-    outcomes = {q.outcome for q in quotes if q.event == event}
-    return "YES" in outcomes and "NO" in outcomes
+    return _group_has_both_outcomes(_index_by_event([q for q in quotes if q.event == event])[event])
 
 
 def has_valid_prices(quotes: List[MarketQuote], event: str) -> bool:
@@ -37,16 +60,7 @@ def has_valid_prices(quotes: List[MarketQuote], event: str) -> bool:
     Returns:
         True if both YES and NO have valid prices (> 0)
     """
-    yes_quotes = [q for q in quotes if q.event == event and q.outcome == "YES"]
-    no_quotes = [q for q in quotes if q.event == event and q.outcome == "NO"]
-    
-    if not yes_quotes or not no_quotes:
-        return False
-    
-    yes_has_price = any(q.price > 0 for q in yes_quotes)
-    no_has_price = any(q.price > 0 for q in no_quotes)
-    
-    return yes_has_price and no_has_price
+    return _group_has_valid_prices(_index_by_event([q for q in quotes if q.event == event])[event])
 
 
 def has_minimum_liquidity(quotes: List[MarketQuote], event: str, min_size: float = 1.0) -> bool:
@@ -60,16 +74,7 @@ def has_minimum_liquidity(quotes: List[MarketQuote], event: str, min_size: float
     Returns:
         True if both YES and NO have sufficient size
     """
-    yes_quotes = [q for q in quotes if q.event == event and q.outcome == "YES"]
-    no_quotes = [q for q in quotes if q.event == event and q.outcome == "NO"]
-    
-    if not yes_quotes or not no_quotes:
-        return False
-    
-    yes_has_liquidity = any(q.size >= min_size for q in yes_quotes)
-    no_has_liquidity = any(q.size >= min_size for q in no_quotes)
-    
-    return yes_has_liquidity and no_has_liquidity
+    return _group_has_minimum_liquidity(_index_by_event([q for q in quotes if q.event == event])[event], min_size)
 
 
 def filter_by_liquidity(quotes: List[MarketQuote], require_both_outcomes: bool = True, min_price: float = 0.0, min_size: float = 0.0) -> List[MarketQuote]:
@@ -94,28 +99,28 @@ def filter_by_liquidity(quotes: List[MarketQuote], require_both_outcomes: bool =
     if not quotes:
         return quotes
     
-    # Group by event
-    events = set(q.event for q in quotes)
+    # Group by event and outcome once; each check then only reads its own group
+    index = _index_by_event(quotes)
     
     # Filter events that meet criteria
     valid_events = set()
-    for event in events:
-        if require_both_outcomes and not has_both_outcomes(quotes, event):
+    for event, group in index.items():
+        if require_both_outcomes and not _group_has_both_outcomes(group):
             continue
         
         if min_price == 0.0:
-            if not has_valid_prices(quotes, event):
+            if not _group_has_valid_prices(group):
                 continue
         else:
             # Check specific price threshold
-            yes_quotes = [q for q in quotes if q.event == event and q.outcome == "YES"]
-            no_quotes = [q for q in quotes if q.event == event and q.outcome == "NO"]
+            yes_quotes = group.get("YES") or []
+            no_quotes = group.get("NO") or []
             if not yes_quotes or not no_quotes:
                 continue
             if not all(q.price >= min_price for q in yes_quotes + no_quotes):
                 continue
         
-        if min_size > 0.0 and not has_minimum_liquidity(quotes, event, min_size):
+        if min_size > 0.0 and not _group_has_minimum_liquidity(group, min_size):
             continue
         
         valid_events.add(event)
@@ -133,17 +138,17 @@ def get_liquidity_summary(quotes: List[MarketQuote]) -> dict:
     Returns:
         Dictionary with liquidity statistics
     """
-    events = set(q.event for q in quotes)
+    index = _index_by_event(quotes)
     
-    both_outcomes = sum(1 for event in events if has_both_outcomes(quotes, event))
-    with_prices = sum(1 for event in events if has_valid_prices(quotes, event))
+    both_outcomes = sum(1 for group in index.values() if _group_has_both_outcomes(group))
+    with_prices = sum(1 for group in index.values() if _group_has_valid_prices(group))
     
     # Count quotes by outcome
     yes_count = sum(1 for q in quotes if q.outcome == "YES" and q.price > 0)
     no_count = sum(1 for q in quotes if q.outcome == "NO" and q.price > 0)
     
     return {
-        "total_events": len(events),
+        "total_events": len(index),
         "events_with_both_outcomes": both_outcomes,
         "events_with_valid_prices": with_prices,
         "yes_quotes_with_price": yes_count,
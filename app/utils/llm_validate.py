@@ -4,61 +4,173 @@ from typing import Dict, Iterable, List, Tuple, Optional
 
 import json
 import os
+from functools import partial
 from pathlib import Path
 
+try:
+    import orjson
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+from app.utils.retry import retry_with_backoff
+
 
 def _cache_paths(model: str) -> Path:
     base = Path(os.getenv("EMBED_CACHE_DIR") or Path.home() / ".cache" / "polykalshi")
     base.mkdir(parents=True, exist_ok=True)
-    return base / f"llm_validate_{model.replace('/', '_')}.json"
+    return base / f"llm_validate_{model.replace('/', '_')}.jsonl"
+
+
+# Per-process view of the on-disk verdict cache, parsed once per file. The file
+# is append-only JSONL, one {"k", "r"} row per verdict; _LINE_COUNTS tracks its
+# length so superseded rows can be compacted away.
+_MEMORY_CACHE: Dict[Path, Dict[str, dict]] = {}
+_LINE_COUNTS: Dict[Path, int] = {}
+
+
+def _loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dump_line(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj) + "\n").encode()
 
 
 def _load_cache(model: str) -> Dict[str, dict]:
     path = _cache_paths(model)
-    if path.exists():
+    data = _MEMORY_CACHE.get(path)
+    if data is None:
+        data = {}
+        lines = 0
+        rewrite = False
+        legacy = path.with_suffix(".json")
         try:
-            return json.loads(path.read_text())
+            if path.exists():
+                with path.open("rb") as f:
+                    for line in f:
+                        lines += 1
+                        # A torn last line from an interrupted write
+                        rewrite = rewrite or not line.endswith(b"\n")
+                        try:
+                            row = _loads(line)
+                            data[row["k"]] = row["r"]
+                        except Exception:
+                            rewrite = True
+            elif legacy.exists():
+                # One-shot migration from the single JSON object written by older versions
+                data = _loads(legacy.read_bytes())
+                rewrite = True
         except Exception:
-            return {}
-    return {}
+            data = {}
+            rewrite = False
+        _MEMORY_CACHE[path] = data
+        _LINE_COUNTS[path] = lines
+        if rewrite:
+            # Left in place, a torn line would swallow the next appended row
+            _compact_cache(path, data)
+    return data
+
+
+def _compact_cache(path: Path, data: Dict[str, dict]) -> None:
+    """Rewrite the JSONL file with one row per key, atomically."""
+    try:
+        tmp = path.with_suffix(".jsonl.tmp")
+        with tmp.open("wb") as f:
+            f.writelines(_dump_line({"k": k, "r": r}) for k, r in data.items())
+        tmp.replace(path)
+        _LINE_COUNTS[path] = len(data)
+    except Exception:
+        pass
 
 
-def _save_cache(model: str, data: Dict[str, dict]) -> None:
+def _append_cache(model: str, rows: Dict[str, dict]) -> None:
+    """Record new verdicts in memory and append them; the rest of the file is untouched."""
+    path = _cache_paths(model)
+    data = _load_cache(model)
+    data.update(rows)
     try:
-        path = _cache_paths(model)
-        path.write_text(json.dumps(data))
+        with path.open("ab") as f:
+            f.writelines(_dump_line({"k": k, "r": r}) for k, r in rows.items())
+        _LINE_COUNTS[path] = _LINE_COUNTS.get(path, 0) + len(rows)
     except Exception:
-        pass
+        return
+    if _LINE_COUNTS[path] > 2 * len(data):
+        _compact_cache(path, data)
 
 
 def _key(a: str, b: str) -> str:
     return f"{a.strip()}|||{b.strip()}"
 
 
-def validate_pairs_openai(
+_SYSTEM_PROMPT = (
+    "You are a strict validator for market title equivalence across two exchanges."
+    " Decide if the two titles describe the SAME underlying event proposition and direction (YES/NO orientation)."
+    " Consider entities, dates, numbers, and resolution criteria."
+    " Reply with strict JSON: {results: [{id, same_event, direction_consistent, rationale}]}."
+)
+
+
+async def _validate_batch(client, model: str, batch: List[Tuple[str, str]]) -> List[dict]:
+    """Validate one batch of pairs in a single prompt; returns verdicts in batch order."""
+    items = []
+    for i, (a, b) in enumerate(batch):
+        items.append({"id": i, "kalshi": a, "polymarket": b})
+    prompt = {
+        "role": "user",
+        "content": (
+            "Validate these pairs. Titles are similar but may differ in phrasing."
+            " Only mark same_event=true if a rational trader could hedge them as the same binary proposition."
+            f" Pairs: {json.dumps(items)}"
+        ),
+    }
+    resp = await client.chat.completions.create(
+        model=model, messages=[{"role": "system", "content": _SYSTEM_PROMPT}, prompt], temperature=0
+    )
+    text = resp.choices[0].message.content or "{}"
+    try:
+        data = _loads(text)
+        rows = data.get("results") or []
+    except Exception:
+        rows = []
+    by_id = {r.get("id"): r for r in rows if isinstance(r, dict)}
+    return [
+        by_id.get(i) or {"same_event": False, "direction_consistent": False, "rationale": "parse_error"}
+        for i in range(len(batch))
+    ]
+
+
+async def validate_pairs_openai_async(
     pairs: List[Tuple[str, str]],
     model: str = "gpt-4o-mini",
     api_key: Optional[str] = None,
     base_url: Optional[str] = None,
     use_cache: bool = True,
+    batch_size: int = 20,
+    max_concurrency: int = 8,
 ) -> Dict[Tuple[str, str], dict]:
     """Use an OpenAI chat model to logically validate that two market titles
     refer to the same underlying event proposition and direction.
 
-    Returns a mapping from (a,b) -> {same_event: bool, direction_consistent: bool, rationale: str}.
+    Uncached pairs are sent in batches of `batch_size` per prompt, with up to
+    `max_concurrency` batches in flight; rate-limited or dropped requests are
+    retried with backoff. Returns a mapping from
+    (a,b) -> {same_event: bool, direction_consistent: bool, rationale: str}.
     Cached by exact title strings and model.
     """
+    import asyncio
+
     try:
-        from openai import OpenAI
+        from openai import APIConnectionError, AsyncOpenAI, RateLimitError
     except Exception as exc:  # pragma: no cover
         raise RuntimeError("openai package not installed; run pip install openai") from exc
 
-    client = OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), base_url=base_url or os.getenv("OPENAI_BASE_URL") or None)
     cache = _load_cache(model) if use_cache else {}
     result: Dict[Tuple[str, str], dict] = {}
 
     to_query: List[Tuple[str, str]] = []
-    for a, b in pairs:
+    for a, b in dict.fromkeys(pairs):
         k = _key(a, b)
         if use_cache and k in cache:
             result[(a, b)] = cache[k]
@@ -66,39 +178,42 @@ def validate_pairs_openai(
             to_query.append((a, b))
 
     if to_query:
-        # Batch pairs in a single prompt for efficiency
-        items = []
-        for i, (a, b) in enumerate(to_query):
-            items.append({"id": i, "kalshi": a, "polymarket": b})
-        sys = (
-            "You are a strict validator for market title equivalence across two exchanges."
-            " Decide if the two titles describe the SAME underlying event proposition and direction (YES/NO orientation)."
-            " Consider entities, dates, numbers, and resolution criteria."
-            " Reply with strict JSON: {results: [{id, same_event, direction_consistent, rationale}]}."
-        )
-        prompt = {
-            "role": "user",
-            "content": (
-                "Validate these pairs. Titles are similar but may differ in phrasing."
-                " Only mark same_event=true if a rational trader could hedge them as the same binary proposition."
-                f" Pairs: {json.dumps(items)}"
-            ),
-        }
-        resp = client.chat.completions.create(model=model, messages=[{"role": "system", "content": sys}, prompt], temperature=0)
-        text = resp.choices[0].message.content or "{}"
+        client = AsyncOpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), base_url=base_url or os.getenv("OPENAI_BASE_URL") or None)
+        batches = [to_query[i : i + batch_size] for i in range(0, len(to_query), max(1, batch_size))]
+        sem = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def _run(batch: List[Tuple[str, str]]) -> List[dict]:
+            async with sem:
+                return await retry_with_backoff(
+                    partial(_validate_batch, client, model, batch),
+                    exceptions=(RateLimitError, APIConnectionError),
+                )
+
         try:
-            data = json.loads(text)
-            rows = data.get("results") or []
-        except Exception:
-            rows = []
-        by_id = {r.get("id"): r for r in rows if isinstance(r, dict)}
-        for i, (a, b) in enumerate(to_query):
-            r = by_id.get(i) or {"same_event": False, "direction_consistent": False, "rationale": "parse_error"}
-            result[(a, b)] = r
-            if use_cache:
-                cache[_key(a, b)] = r
-        _save_cache(model, cache)
+            verdicts = await asyncio.gather(*(_run(batch) for batch in batches))
+        finally:
+            await client.close()
+        fresh: Dict[str, dict] = {}
+        for batch, rows in zip(batches, verdicts):
+            for (a, b), r in zip(batch, rows):
+                result[(a, b)] = r
+                fresh[_key(a, b)] = r
+        if use_cache:
+            _append_cache(model, fresh)
 
     return result
 
 
+def validate_pairs_openai(
+    pairs: List[Tuple[str, str]],
+    model: str = "gpt-4o-mini",
+    api_key: Optional[str] = None,
+    base_url: Optional[str] = None,
+    use_cache: bool = True,
+) -> Dict[Tuple[str, str], dict]:
+    """Blocking wrapper around `validate_pairs_openai_async`."""
+    import asyncio
+
+    return asyncio.run(
+        validate_pairs_openai_async(pairs, model=model, api_key=api_key, base_url=base_url, use_cache=use_cache)
+    )
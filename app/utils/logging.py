@@ -1,8 +1,37 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 
 
+# One stderr writer shared by every app logger. Records reach it through a
+# queue drained by a background thread, so callers never block on stream I/O.
+_queue_handler: Optional[QueueHandler] = None
+_queue_lock = threading.Lock()
+
+
+def _shared_handler() -> QueueHandler:
+    global _queue_handler
+    with _queue_lock:
+        if _queue_handler is None:
+            handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+            handler.setFormatter(formatter)
+            records: queue.SimpleQueue = queue.SimpleQueue()
+            listener = QueueListener(records, handler)
+            listener.start()
+            # Flush queued records before the interpreter exits
+            atexit.register(listener.stop)
+            _queue_handler = QueueHandler(records)
+        return _queue_handler
+
+
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     level_str = os.environ.get("LOG_LEVEL", "INFO").upper()
     level = getattr(logging, level_str, logging.INFO)
@@ -12,13 +41,7 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
         logger.setLevel(level)
         return logger
 
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
+    logger.addHandler(_shared_handler())
     logger.setLevel(level)
     logger.propagate = False
     return logger
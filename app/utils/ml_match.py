@@ -2,16 +2,95 @@ from __future__ import annotations
 
 from typing import Dict, Iterable, List, Tuple
 
-import math
+import hashlib
+import os
+from pathlib import Path
+
+import numpy as np
 
 try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+    from scipy import sparse
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
 except Exception:  # pragma: no cover - optional dependency
-    TfidfVectorizer = None  # type: ignore
-    cosine_similarity = None  # type: ignore
+    sparse = None  # type: ignore
+    HashingVectorizer = None  # type: ignore
+    TfidfTransformer = None  # type: ignore
+
+from app.utils.text import normalize_text, number_window_ids
+
+
+# Source rows scored per sparse product; bounds the dense (block, n_targets) buffer
+_SIM_BLOCK = 1024
+
+# Hashed n-gram space. Some n-grams of a large title corpus do share a bucket;
+# each collision nudges a few scores slightly, far below the match thresholds.
+_N_FEATURES = 2**20
+
+# Ranking only needs single precision; halves the matrices and product traffic
+_DTYPE = np.float32
+
+# TF-IDF matrices kept on disk; older files are evicted by modification time
+_MATRIX_CACHE_ENTRIES = 8
+
+
+def _word_ngrams(doc: str) -> List[str]:
+    """1- to 3-word n-grams of a `normalize_text` title.
+
+    Normalized titles are lowercase ASCII words separated by single spaces, so
+    `str.split` yields exactly the tokens of sklearn's default `token_pattern`
+    (which also drops one-character words) without running its regex.
+    """
+    toks = [w for w in doc.split() if len(w) > 1]
+    grams = list(toks)
+    grams.extend(f"{a} {b}" for a, b in zip(toks, toks[1:]))
+    grams.extend(f"{a} {b} {c}" for a, b, c in zip(toks, toks[1:], toks[2:]))
+    return grams
+
+
+def _matrix_cache_path(corpus: List[str]) -> Path:
+    base = Path(os.getenv("EMBED_CACHE_DIR") or Path.home() / ".cache" / "polykalshi")
+    base.mkdir(parents=True, exist_ok=True)
+    # Normalized titles never contain newlines, so joining on them is unambiguous
+    digest = hashlib.sha256(f"{_N_FEATURES}:{np.dtype(_DTYPE).name}\n".encode() + "\n".join(corpus).encode()).hexdigest()
+    return base / f"tfidf_{digest}.npz"
+
+
+def _tfidf_matrix(corpus: List[str]):
+    """L2-normalized TF-IDF rows for `corpus`, reused from disk when the same
+    titles were vectorized by an earlier run."""
+    path = _matrix_cache_path(corpus)
+    try:
+        X = sparse.load_npz(path)
+        path.touch()
+        return X
+    except Exception:
+        pass
 
-from app.utils.text import normalize_text, extract_numbers_window
+    # Hashing n-grams skips building a vocabulary; IDF weighting and L2 rows
+    # are then applied exactly as TfidfVectorizer would. Titles worded the same
+    # on both exchanges are tokenized once, then their count rows repeated so
+    # document frequencies are unchanged.
+    uniq = list(dict.fromkeys(corpus))
+    row_of = {t: i for i, t in enumerate(uniq)}
+    counts = HashingVectorizer(
+        analyzer=_word_ngrams, n_features=_N_FEATURES, alternate_sign=False, norm=None, dtype=_DTYPE
+    ).transform(uniq)
+    if len(uniq) < len(corpus):
+        counts = counts[[row_of[t] for t in corpus]]
+    X = TfidfTransformer().fit_transform(counts).tocsr()
+
+    # Best-effort cache
+    try:
+        tmp = path.with_suffix(".npz.tmp")
+        with tmp.open("wb") as f:
+            sparse.save_npz(f, X, compressed=False)
+        tmp.replace(path)
+        stale = sorted(path.parent.glob("tfidf_*.npz"), key=lambda p: p.stat().st_mtime)
+        for old in stale[:-_MATRIX_CACHE_ENTRIES]:
+            old.unlink(missing_ok=True)
+    except Exception:
+        pass
+    return X
 
 
 def build_tfidf_map(
@@ -25,7 +104,7 @@ def build_tfidf_map(
     Returns a dict: original_source -> (best_target, score)
     If sklearn is unavailable, returns an empty mapping.
     """
-    if TfidfVectorizer is None or cosine_similarity is None:
+    if sparse is None or HashingVectorizer is None or TfidfTransformer is None:
         return {}
 
     src_list = list(dict.fromkeys(sources))
@@ -34,29 +113,29 @@ def build_tfidf_map(
         return {}
 
     corpus = [normalize_text(s) for s in src_list] + [normalize_text(t) for t in tgt_list]
-    vec = TfidfVectorizer(ngram_range=(1, 3), min_df=1)
-    X = vec.fit_transform(corpus)
+    X = _tfidf_matrix(corpus)
     src_X = X[: len(src_list)]
     tgt_X = X[len(src_list) :]
 
-    sims = cosine_similarity(src_X, tgt_X)
+    # TfidfTransformer L2-normalizes rows, so the sparse dot product is the
+    # cosine; only one block of sources is densified at a time. The transpose
+    # is converted to CSR once, not by every block's product.
+    tgt_T = tgt_X.T.tocsr()
+    if strict_numbers:
+        s_ids, t_ids = number_window_ids(src_list, tgt_list)
+    best_j = np.zeros(len(src_list), dtype=np.int64)
+    best = np.zeros(len(src_list), dtype=_DTYPE)
+    for start in range(0, len(src_list), _SIM_BLOCK):
+        stop = start + _SIM_BLOCK
+        sims = (src_X[start:stop] @ tgt_T).toarray()
+        if strict_numbers:
+            # Pairs whose numeric windows differ can never be the best target
+            ids = s_ids[start:stop, None]
+            sims[(ids >= 0) & (t_ids >= 0) & (ids != t_ids)] = -np.inf
+        best_j[start:stop] = sims.argmax(axis=1)
+        best[start:stop] = sims[np.arange(sims.shape[0]), best_j[start:stop]]
+
     mapping: Dict[str, Tuple[str, float]] = {}
-    for i, s_orig in enumerate(src_list):
-        best_j = -1
-        best = -math.inf
-        for j, _ in enumerate(tgt_list):
-            score = float(sims[i, j])
-            if strict_numbers:
-                nums_s = extract_numbers_window(s_orig)
-                nums_t = extract_numbers_window(tgt_list[j])
-                if nums_s and nums_t and nums_s != nums_t:
-                    continue
-            if score > best:
-                best = score
-                best_j = j
-        if best_j >= 0 and best >= min_similarity:
-            mapping[s_orig] = (tgt_list[best_j], best)
+    for i in np.flatnonzero(best >= min_similarity).tolist():
+        mapping[src_list[i]] = (tgt_list[int(best_j[i])], float(best[i]))
     return mapping
-
-
-
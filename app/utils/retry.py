@@ -7,6 +7,7 @@ without overwhelming servers with rapid retries.
 
 import asyncio
 import random
+import time
 from functools import wraps
 from typing import TypeVar, Callable, Type, Tuple, Optional
 
@@ -72,7 +73,7 @@ async def retry_with_backoff(
                     attempt + 1,
                     max_retries,
                     actual_delay,
-                    str(e)
+                    e
                 )
                 
                 await asyncio.sleep(actual_delay)
@@ -81,7 +82,7 @@ async def retry_with_backoff(
                 logger.warning(
                     "All %d retry attempts failed: %s",
                     max_retries,
-                    str(e)
+                    e
                 )
     
     if last_exception:
@@ -99,10 +100,14 @@ def retry_sync_with_backoff(
     exceptions: Tuple[Type[Exception], ...] = (Exception,),
     jitter: bool = True,
     *args,
+    total_timeout: Optional[float] = None,
     **kwargs
 ) -> T:
     """Retry a synchronous function with exponential backoff.
     
+    Sleeps with `time.sleep`, so it refuses to run inside an event loop where
+    it would stall every other task; use `retry_with_backoff` there.
+    
     Args:
         func: The function to retry
         max_retries: Maximum number of retry attempts
@@ -112,14 +117,27 @@ def retry_sync_with_backoff(
         exceptions: Tuple of exception types to catch and retry
         jitter: Whether to add random jitter to delays
         *args: Positional arguments to pass to func
+        total_timeout: Keyword-only overall budget in seconds; stop retrying
+            rather than sleep past it (None for no budget)
         **kwargs: Keyword arguments to pass to func
         
     Returns:
         The result of calling func
         
     Raises:
+        RuntimeError: If called while an event loop is running
         The last exception raised by func if all retries fail
     """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        raise RuntimeError(
+            "retry_sync_with_backoff would block the running event loop; use retry_with_backoff"
+        )
+
+    deadline = time.monotonic() + total_timeout if total_timeout is not None else None
     delay = initial_delay
     last_exception = None
     
@@ -138,22 +156,30 @@ def retry_sync_with_backoff(
                 
                 actual_delay = min(actual_delay, max_delay)
                 
+                if deadline is not None and time.monotonic() + actual_delay > deadline:
+                    logger.warning(
+                        "Retry budget of %.2fs exhausted after %d attempts: %s",
+                        total_timeout,
+                        attempt + 1,
+                        e
+                    )
+                    break
+                
                 logger.debug(
                     "Retry attempt %d/%d after %.2fs: %s",
                     attempt + 1,
                     max_retries,
                     actual_delay,
-                    str(e)
+                    e
                 )
                 
-                import time
                 time.sleep(actual_delay)
                 delay *= backoff_factor
             else:
                 logger.warning(
                     "All %d retry attempts failed: %s",
                     max_retries,
-                    str(e)
+                    e
                 )
     
     if last_exception:
@@ -1,30 +1,132 @@
 import re
 import unicodedata
 from difflib import SequenceMatcher
-from typing import Tuple, Set, Optional
+from functools import lru_cache
+from typing import FrozenSet, Tuple, Optional, Sequence
 
+import numpy as np
 
+try:
+    from rapidfuzz import fuzz as _rf_fuzz
+    from rapidfuzz import process as _rf_process
+except Exception:  # pragma: no cover - optional dependency
+    _rf_fuzz = None
+    _rf_process = None
+
+
+# Patterns used on every title in the matching hot path, compiled once at import
+_SINGLE_QUOTE_RE = re.compile(r"[\u2018\u2019]")
+_DOUBLE_QUOTE_RE = re.compile(r"[\u201c\u201d]")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]+")
+_SPACE_RE = re.compile(r"\s+")
+_NUM_RE = re.compile(r"\d{1,4}")
+_ENTITY_RE = re.compile(r"[A-Z][a-zA-Z]+|[A-Z]{2,}|[A-Z][a-z]+\.[A-Z][a-z]+")
+_YIS_SUBJECT_RE = re.compile(r"will\s+(.+?)\s+be\b", re.IGNORECASE)
+
+# Below this many pairs, starting cdist's thread pool costs more than scoring
+_CDIST_PARALLEL_MIN_PAIRS = 4096
+
+
+# Titles repeat across matcher passes and helpers (similarity, TF-IDF, key
+# terms), so the two per-title parsers are memoized
+@lru_cache(maxsize=16384)
 def normalize_text(value: str) -> str:
     value = unicodedata.normalize("NFKC", value)
     value = value.lower()
-    value = re.sub(r"[\u2018\u2019]", "'", value)
-    value = re.sub(r"[\u201c\u201d]", '"', value)
-    value = re.sub(r"[^a-z0-9\s]+", " ", value)
-    value = re.sub(r"\s+", " ", value).strip()
+    value = _SINGLE_QUOTE_RE.sub("'", value)
+    value = _DOUBLE_QUOTE_RE.sub('"', value)
+    value = _NON_ALNUM_RE.sub(" ", value)
+    value = _SPACE_RE.sub(" ", value).strip()
     return value
 
 
 def similarity(a: str, b: str) -> float:
     na = normalize_text(a)
     nb = normalize_text(b)
+    if _rf_fuzz is not None:
+        # Same scorer as `similarity_matrix`, so single pairs and grids agree
+        return _rf_fuzz.ratio(na, nb) / 100.0
     return SequenceMatcher(None, na, nb).ratio()
 
 
+def similarity_matrix(
+    sources: Sequence[str], targets: Sequence[str], score_cutoff: float = 0.0
+) -> np.ndarray:
+    """Return a float64 (len(sources), len(targets)) matrix of similarity scores.
+
+    Uses RapidFuzz's C++ `cdist` when installed, otherwise falls back to calling
+    `similarity` per pair. Scores below `score_cutoff` are reported as 0. Each
+    entry equals `similarity` for that pair exactly, so `>=` thresholds agree.
+    """
+    if not sources or not targets:
+        return np.zeros((len(sources), len(targets)), dtype=np.float64)
+    if _rf_process is not None:
+        # The cutoff is loosened slightly in percent space (0.7 * 100 is just
+        # above 70) and then applied exactly on the 0-1 scores below
+        scores = _rf_process.cdist(
+            sources,
+            targets,
+            scorer=_rf_fuzz.ratio,
+            processor=normalize_text,
+            score_cutoff=max(score_cutoff * 100.0 - 1e-6, 0.0),
+            dtype=np.float64,
+            workers=-1 if len(sources) * len(targets) >= _CDIST_PARALLEL_MIN_PAIRS else 1,
+        )
+        scores /= 100.0
+        scores[scores < score_cutoff] = 0.0
+        return scores
+    # Normalize each title once, and let SequenceMatcher reuse its analysis of
+    # the target (seq2) across all sources. The cheap upper bounds skip the
+    # full ratio for pairs that cannot reach the cutoff.
+    norm_sources = [normalize_text(a) for a in sources]
+    scores = np.zeros((len(sources), len(targets)), dtype=np.float64)
+    matcher = SequenceMatcher(None)
+    for j, b in enumerate(targets):
+        matcher.set_seq2(normalize_text(b))
+        for i, na in enumerate(norm_sources):
+            matcher.set_seq1(na)
+            if score_cutoff > 0.0 and (
+                matcher.real_quick_ratio() < score_cutoff or matcher.quick_ratio() < score_cutoff
+            ):
+                continue
+            scores[i, j] = matcher.ratio()
+    scores[scores < score_cutoff] = 0.0
+    return scores
+
+
+@lru_cache(maxsize=16384)
 def extract_numbers_window(value: str) -> Tuple[int, ...]:
-    return tuple(int(x) for x in re.findall(r"\d{1,4}", value))
+    return tuple(int(x) for x in _NUM_RE.findall(value))
+
+
+def number_window_ids(sources: Sequence[str], targets: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Integer ids of each title's numeric window, shared across both lists.
+
+    Titles without numbers get -1, so a pair passes the number guard when
+    either id is negative or the two ids are equal.
+    """
+    ids: dict[Tuple[int, ...], int] = {}
+
+    def _ids(titles: Sequence[str]) -> np.ndarray:
+        return np.array(
+            [ids.setdefault(n, len(ids)) if n else -1 for n in map(extract_numbers_window, titles)],
+            dtype=np.int64,
+        )
+
+    return _ids(sources), _ids(targets)
+
+
+def numbers_compatible_mask(sources: Sequence[str], targets: Sequence[str]) -> np.ndarray:
+    """Boolean (len(sources), len(targets)) mask of pairs passing the number guard.
+
+    A pair is rejected only when both titles contain numeric windows and those
+    windows differ (e.g. different years or price thresholds).
+    """
+    s_ids, t_ids = number_window_ids(sources, targets)
+    return (s_ids[:, None] < 0) | (t_ids[None, :] < 0) | (s_ids[:, None] == t_ids[None, :])
 
 
-_STOP_ENTS = {
+_STOP_ENTS = frozenset({
     "will",
     "the",
     "of",
@@ -48,20 +150,16 @@ _STOP_ENTS = {
     "october",
     "november",
     "december",
-}
+})
 
 
-def extract_entity_tokens(value: str) -> Set[str]:
-    raw_tokens = re.findall(r"[A-Z][a-zA-Z]+|[A-Z]{2,}|[A-Z][a-z]+\.[A-Z][a-z]+", value)
-    ents: Set[str] = set()
-    for t in raw_tokens:
-        k = t.lower()
-        if k in _STOP_ENTS:
-            continue
-        ents.add(k)
-    return ents
+@lru_cache(maxsize=16384)
+def extract_entity_tokens(value: str) -> FrozenSet[str]:
+    # Frozen so the memoized result can be shared safely between callers
+    return frozenset(k for k in map(str.lower, _ENTITY_RE.findall(value)) if k not in _STOP_ENTS)
 
 
+@lru_cache(maxsize=16384)
 def extract_yis_actor_subject(value: str) -> Optional[str]:
     """Extract normalized subject name for Google 'Year in Search' Actors titles.
 
@@ -70,9 +168,10 @@ def extract_yis_actor_subject(value: str) -> Optional[str]:
     if not value:
         return None
     low = value.lower()
-    if ("year in search" not in low) or ("actor" not in low and "actors" not in low):
+    # "actor" also covers "actors"
+    if "year in search" not in low or "actor" not in low:
         return None
-    m = re.search(r"will\s+(.+?)\s+be\b", value, flags=re.IGNORECASE)
+    m = _YIS_SUBJECT_RE.search(value)
     if not m:
         return None
     subj = m.group(1).strip()
@@ -4,22 +4,54 @@ This module provides timing decorators and context managers to measure
 execution time of operations for debugging and optimization.
 """
 
-import time
-from contextlib import contextmanager
+from time import perf_counter
 from functools import wraps
 from typing import Callable, Dict, Optional
 
 
+def format_duration(seconds: float) -> str:
+    """Format seconds into human-readable string.
+    
+    Args:
+        seconds: Time in seconds
+        
+    Returns:
+        Formatted string (e.g., "1.23s", "123ms", "5m 32s")
+    """
+    if seconds < 0.001:
+        return f"{seconds * 1000000:.0f}μs"
+    elif seconds < 1:
+        return f"{seconds * 1000:.0f}ms"
+    elif seconds < 60:
+        return f"{seconds:.2f}s"
+    else:
+        minutes = int(seconds // 60)
+        secs = seconds % 60
+        return f"{minutes}m {secs:.1f}s"
+
+
 class TimingTracker:
     """Track multiple timing intervals."""
     
+    __slots__ = ("timings", "_starts", "_version", "_summary", "_summary_version")
+    
     def __init__(self):
         self.timings: Dict[str, float] = {}
-        self._starts: Dict[str, float] = {}
+        # None marks a stopped operation; keys stay put so restarting the same
+        # name each poll overwrites its slot instead of leaving a tombstone
+        self._starts: Dict[str, Optional[float]] = {}
+        # Bumped by every _record; summary() reformats only when it moved
+        self._version = 0
+        self._summary: Dict[str, str] = {}
+        self._summary_version = -1
+    
+    def _record(self, name: str, seconds: float) -> None:
+        self.timings[name] = seconds
+        self._version += 1
     
     def start(self, name: str) -> None:
         """Start timing an operation."""
-        self._starts[name] = time.time()
+        self._starts[name] = perf_counter()
     
     def stop(self, name: str) -> float:
         """Stop timing an operation and return elapsed time.
@@ -30,51 +62,44 @@ class TimingTracker:
         Returns:
             Elapsed time in seconds
         """
-        if name not in self._starts:
+        started = self._starts.get(name)
+        if started is None:
             return 0.0
         
-        elapsed = time.time() - self._starts[name]
-        self.timings[name] = elapsed
-        del self._starts[name]
+        self._starts[name] = None
+        elapsed = perf_counter() - started
+        self._record(name, elapsed)
         return elapsed
     
     def get(self, name: str) -> Optional[float]:
         """Get timing for a completed operation."""
         return self.timings.get(name)
     
-    def format_time(self, seconds: float) -> str:
-        """Format seconds into human-readable string.
-        
-        Args:
-            seconds: Time in seconds
-            
-        Returns:
-            Formatted string (e.g., "1.23s", "123ms", "5m 32s")
-        """
-        if seconds < 0.001:
-            return f"{seconds * 1000000:.0f}μs"
-        elif seconds < 1:
-            return f"{seconds * 1000:.0f}ms"
-        elif seconds < 60:
-            return f"{seconds:.2f}s"
-        else:
-            minutes = int(seconds // 60)
-            secs = seconds % 60
-            return f"{minutes}m {secs:.1f}s"
+    # One implementation shared with the module-level helper
+    format_time = staticmethod(format_duration)
     
     def summary(self) -> Dict[str, str]:
         """Get all timings formatted as strings.
         
+        Formatting is redone only after a new timing is recorded through
+        stop(), timer or timed_function.
+        
         Returns:
             Dictionary of operation names to formatted time strings
         """
-        return {name: self.format_time(seconds) for name, seconds in self.timings.items()}
+        if self._summary_version != self._version:
+            fmt = format_duration
+            self._summary = {name: fmt(seconds) for name, seconds in self.timings.items()}
+            self._summary_version = self._version
+        return dict(self._summary)
 
 
-@contextmanager
-def timer(name: str, tracker: Optional[TimingTracker] = None):
+class timer:
     """Context manager for timing code blocks.
     
+    A plain class rather than a @contextmanager generator, so entering and
+    leaving a block costs two method calls and no generator frame.
+    
     Args:
         name: Name of the operation being timed
         tracker: Optional TimingTracker instance to record timings
@@ -84,13 +109,21 @@ def timer(name: str, tracker: Optional[TimingTracker] = None):
             # code to time
             pass
     """
-    start = time.time()
-    try:
-        yield
-    finally:
-        elapsed = time.time() - start
-        if tracker:
-            tracker.timings[name] = elapsed
+    
+    __slots__ = ("name", "tracker", "_start")
+    
+    def __init__(self, name: str, tracker: Optional[TimingTracker] = None):
+        self.name = name
+        self.tracker = tracker
+    
+    def __enter__(self) -> "timer":
+        self._start = perf_counter()
+        return self
+    
+    def __exit__(self, *exc) -> None:
+        elapsed = perf_counter() - self._start
+        if self.tracker is not None:
+            self.tracker._record(self.name, elapsed)
 
 
 def timed_function(tracker: Optional[TimingTracker] = None):
@@ -107,35 +140,12 @@ def timed_function(tracker: Optional[TimingTracker] = None):
     def decorator(func: Callable) -> Callable:
         @wraps(func)
         def wrapper(*args, **kwargs):
-            start = time.time()
+            start = perf_counter()
             try:
                 return func(*args, **kwargs)
             finally:
-                elapsed = time.time() - start
+                elapsed = perf_counter() - start
                 if tracker:
-                    tracker.timings[func.__name__] = elapsed
+                    tracker._record(func.__name__, elapsed)
         return wrapper
     return decorator
-
-
-def format_duration(seconds: float) -> str:
-    """Format seconds into human-readable string.
-    
-    Args:
-        seconds: Time in seconds
-        
-    Returns:
-        Formatted string (e.g., "1.23s", "123ms", "5m 32s")
-    """
-    if seconds < 0.001:
-        return f"{seconds * 1000000:.0f}μs"
-    elif seconds < 1:
-        return f"{seconds * 1000:.0f}ms"
-    elif seconds < 60:
-        return f"{seconds:.2f}s"
-    else:
-        minutes = int(seconds // 60)
-        secs = seconds % 60
-        return f"{minutes}m {secs:.1f}s"
-
-
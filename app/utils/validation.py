@@ -8,6 +8,13 @@ financial losses from invalid data.
 from typing import Any
 
 
+# Built once; a tuple of names in an isinstance call is rebuilt on every call
+_NUMERIC_TYPES = (int, float)
+
+# Common spellings mapped straight to the canonical outcome constants
+_OUTCOMES = {"YES": "YES", "Yes": "YES", "yes": "YES", "NO": "NO", "No": "NO", "no": "NO"}
+
+
 class ValidationError(ValueError):
     """Raised when input validation fails."""
     pass
@@ -26,10 +33,11 @@ def validate_price(price: Any, label: str = "price") -> float:
     Raises:
         ValidationError: If price is invalid
     """
-    if not isinstance(price, (int, float)):
-        raise ValidationError(f"{label} must be numeric, got {type(price).__name__}")
-    
-    price = float(price)
+    # Floats, the common case, skip the isinstance test and the coercion
+    if type(price) is not float:
+        if not isinstance(price, _NUMERIC_TYPES):
+            raise ValidationError(f"{label} must be numeric, got {type(price).__name__}")
+        price = float(price)
     
     if not 0 <= price <= 1:
         raise ValidationError(f"{label} must be between 0 and 1, got {price}")
@@ -50,10 +58,11 @@ def validate_size(size: Any, label: str = "size") -> float:
     Raises:
         ValidationError: If size is invalid
     """
-    if not isinstance(size, (int, float)):
-        raise ValidationError(f"{label} must be numeric, got {type(size).__name__}")
-    
-    size = float(size)
+    # Floats, the common case, skip the isinstance test and the coercion
+    if type(size) is not float:
+        if not isinstance(size, _NUMERIC_TYPES):
+            raise ValidationError(f"{label} must be numeric, got {type(size).__name__}")
+        size = float(size)
     
     if size < 0:
         raise ValidationError(f"{label} must be non-negative, got {size}")
@@ -125,6 +134,11 @@ def validate_outcome(outcome: Any, label: str = "outcome") -> str:
     Raises:
         ValidationError: If outcome is invalid
     """
+    if type(outcome) is str:
+        canonical = _OUTCOMES.get(outcome)
+        if canonical is not None:
+            return canonical
+    
     if not isinstance(outcome, str):
         outcome = str(outcome)
     
@@ -147,6 +161,10 @@ def clip_price(price: float, min_val: float = 0.01, max_val: float = 0.99) -> fl
     Returns:
         Clipped price value
     """
-    return max(min_val, min(max_val, float(price)))
+    # Same result as max(min_val, min(max_val, price)), NaN included, without
+    # the two builtin calls
+    p = price if type(price) is float else float(price)
+    p = p if p < max_val else max_val
+    return p if p > min_val else min_val
 
 
@@ -0,0 +1,72 @@
+def _pair(exchange, event, yes, no, size=100.0):
+    from app.core.models import MarketQuote
+
+    return [
+        MarketQuote(exchange, f"{exchange}-{event}-YES", event, "YES", yes, size),
+        MarketQuote(exchange, f"{exchange}-{event}-NO", event, "NO", no, size),
+    ]
+
+
+def test_match_scores_are_threshold_independent():
+    from app.core.arb import detect_arbs_with_matcher, match_events_by_similarity
+
+    kalshi = _pair("kalshi", "Will BTC close above 100k in 2025?", 0.30, 0.70)
+    poly = _pair("polymarket", "Will Bitcoin close above 100k in 2025?", 0.40, 0.60)
+
+    scored = match_events_by_similarity([q.event for q in kalshi], [q.event for q in poly])
+    (ep, score), = scored.values()
+    assert ep == "will bitcoin close above 100k in 2025?"
+    assert 0.0 < score < 1.0
+
+    assert detect_arbs_with_matcher(kalshi, poly, similarity_threshold=score)
+    assert not detect_arbs_with_matcher(kalshi, poly, similarity_threshold=min(1.0, score + 0.01))
+
+
+def test_explicit_map_bypasses_threshold():
+    from app.core.arb import detect_arbs_with_matcher
+
+    kalshi = _pair("kalshi", "Fed cut in December?", 0.30, 0.70)
+    poly = _pair("polymarket", "FOMC lowers rates Dec", 0.40, 0.60)
+
+    arbs = detect_arbs_with_matcher(
+        kalshi,
+        poly,
+        similarity_threshold=0.99,
+        explicit_map={"Fed cut in December?": "FOMC lowers rates Dec"},
+    )
+    assert arbs
+    assert all(a.long.exchange != a.short.exchange for a in arbs)
+
+
+def test_fee_and_profit_overrides_match_settings():
+    from app.config.settings import settings
+    from app.core.arb import detect_arbs
+
+    kalshi = _pair("kalshi", "Fed cut in December?", 0.30, 0.70)
+    poly = _pair("polymarket", "Fed cut in December?", 0.40, 0.60)
+
+    default = detect_arbs(kalshi, poly)
+    explicit = detect_arbs(
+        kalshi,
+        poly,
+        total_bps=settings.fees.taker_bps + settings.risk.slippage_bps,
+        min_profit_usd=settings.risk.min_profit_usd,
+    )
+    assert [a.edge_bps for a in default] == [a.edge_bps for a in explicit]
+
+    cheaper = detect_arbs(kalshi, poly, total_bps=0.0, min_profit_usd=0.0)
+    assert cheaper and all(c.edge_bps >= d.edge_bps for c, d in zip(cheaper, default))
+
+
+def test_profit_for_budget_accepts_arrays():
+    import numpy as np
+
+    from app.core.arb import calculate_profit_for_budget
+
+    edge_bps = np.array([250.0, 40.0, 0.0])
+    max_notional = np.array([500.0, 5000.0, 100.0])
+    notional, _, _, profit = calculate_profit_for_budget(edge_bps, max_notional, 1000.0)
+    for i in range(3):
+        n, _, _, p = calculate_profit_for_budget(float(edge_bps[i]), float(max_notional[i]), 1000.0)
+        assert notional[i] == n
+        assert profit[i] == p
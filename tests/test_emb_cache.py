@@ -0,0 +1,15 @@
+def test_emb_cache_round_trip_and_reopen(tmp_path):
+    import numpy as np
+
+    from app.utils.emb_cache import EmbCache
+
+    cache = EmbCache(tmp_path)
+    cache.add({"a": np.arange(4, dtype=np.float32), "b": np.ones(4), "c": np.ones(3)})
+    cache.add({"a": np.zeros(4), "d": np.full(4, 2.0)})
+
+    reopened = EmbCache(tmp_path)
+    pos, rows = reopened.get(["d", "missing", "a"])
+    assert pos == [0, 2]
+    assert rows.dtype == np.float32
+    assert rows.tolist() == [[2.0] * 4, [0.0, 1.0, 2.0, 3.0]]
+    assert "c" not in reopened.idx
@@ -0,0 +1,72 @@
+def _reopen(path):
+    from app.utils import llm_validate
+
+    llm_validate._MEMORY_CACHE.pop(path, None)
+    llm_validate._LINE_COUNTS.pop(path, None)
+
+
+def test_torn_last_line_is_dropped_before_appending(tmp_path, monkeypatch):
+    from app.utils import llm_validate
+
+    monkeypatch.setenv("EMBED_CACHE_DIR", str(tmp_path))
+    path = llm_validate._cache_paths("m")
+    path.write_bytes(b'{"k": "a|||b", "r": {"same_event": true}}\n{"k": "c|||d", "r": {"sa')
+
+    assert list(llm_validate._load_cache("m")) == ["a|||b"]
+    llm_validate._append_cache("m", {"e|||f": {"same_event": False}})
+
+    _reopen(path)
+    assert llm_validate._load_cache("m") == {
+        "a|||b": {"same_event": True},
+        "e|||f": {"same_event": False},
+    }
+
+
+def test_superseded_rows_are_compacted(tmp_path, monkeypatch):
+    from app.utils import llm_validate
+
+    monkeypatch.setenv("EMBED_CACHE_DIR", str(tmp_path))
+    path = llm_validate._cache_paths("m")
+    for same in (True, False, True):
+        llm_validate._append_cache("m", {"a|||b": {"same_event": same}})
+
+    assert path.read_bytes().count(b"\n") == 1
+    _reopen(path)
+    assert llm_validate._load_cache("m") == {"a|||b": {"same_event": True}}
+
+
+def test_legacy_json_cache_is_migrated(tmp_path, monkeypatch):
+    import json
+
+    from app.utils import llm_validate
+
+    monkeypatch.setenv("EMBED_CACHE_DIR", str(tmp_path))
+    path = llm_validate._cache_paths("m")
+    path.with_suffix(".json").write_text(json.dumps({"a|||b": {"same_event": True}}))
+
+    assert llm_validate._load_cache("m") == {"a|||b": {"same_event": True}}
+    assert path.exists()
+    _reopen(path)
+    assert llm_validate._load_cache("m") == {"a|||b": {"same_event": True}}
+
+
+def test_uncached_run_leaves_cache_file_alone(tmp_path, monkeypatch):
+    import asyncio
+
+    from app.utils import llm_validate
+
+    monkeypatch.setenv("EMBED_CACHE_DIR", str(tmp_path))
+    path = llm_validate._cache_paths("m")
+    llm_validate._append_cache("m", {"a|||b": {"same_event": True}})
+    before = path.read_bytes()
+
+    async def fake_batch(client, model, batch):
+        return [{"same_event": False, "direction_consistent": False, "rationale": ""} for _ in batch]
+
+    monkeypatch.setattr(llm_validate, "_validate_batch", fake_batch)
+    result = asyncio.run(
+        llm_validate.validate_pairs_openai_async([("a", "b"), ("c", "d")], model="m", api_key="test", use_cache=False)
+    )
+
+    assert result[("a", "b")]["same_event"] is False
+    assert path.read_bytes() == before
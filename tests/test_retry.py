@@ -0,0 +1,36 @@
+def test_retry_sync_refuses_running_loop():
+    import asyncio
+
+    import pytest
+
+    from app.utils.retry import retry_sync_with_backoff
+
+    async def main():
+        retry_sync_with_backoff(lambda: 1)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(main())
+
+
+def test_retry_sync_stops_at_total_timeout():
+    import pytest
+
+    from app.utils.retry import retry_sync_with_backoff
+
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        retry_sync_with_backoff(
+            fail, 5, 0.2, jitter=False, total_timeout=0.1
+        )
+    assert len(calls) == 1
+
+
+def test_retry_sync_passes_positional_args():
+    from app.utils.retry import retry_sync_with_backoff
+
+    assert retry_sync_with_backoff(lambda a, b: a + b, 3, 0.0, 2.0, 60.0, (Exception,), False, 1, 2) == 3
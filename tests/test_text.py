@@ -0,0 +1,19 @@
+def test_similarity_matrix_matches_pairwise_similarity():
+    from app.utils.text import numbers_compatible_mask, similarity, similarity_matrix
+
+    ks = ["Will BTC close above 100k in 2025?", "Fed cut in December?"]
+    ps = ["Will Bitcoin close above 100k in 2025?", "Will BTC close above 100k in 2026?"]
+
+    scores = similarity_matrix(ks, ps)
+    assert scores.shape == (2, 2)
+    assert scores.tolist() == [[similarity(k, p) for p in ps] for k in ks]
+
+    # fuzz ratio of exactly 70 must survive a 0.7 cutoff, as `similarity` does
+    assert similarity("abcdefghij", "abcdefgxyz") == 0.7
+    assert float(similarity_matrix(["abcdefghij"], ["abcdefgxyz"], score_cutoff=0.7)[0, 0]) == 0.7
+
+    cut = similarity_matrix(ks, ps, score_cutoff=0.9)
+    assert float(cut[1, 0]) == 0.0
+
+    mask = numbers_compatible_mask(ks, ps)
+    assert mask.tolist() == [[True, False], [True, True]]